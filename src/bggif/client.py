@@ -0,0 +1,476 @@
+# -*- coding: utf-8 -*-
+"""A shared HTTP client for the BoardGameGeek (BGG) XML API.
+
+Every bggif request goes through a single :class:`aiohttp.ClientSession` that
+lives as long as the bot. Its connector pools and keeps alive connections to
+BGG and caches DNS lookups, so a command does not pay for a new TCP connection
+and TLS handshake. Identical requests made while one is already in flight
+share its result instead of going to BGG again.
+
+Parsed results fetched with :meth:`BggClient.fetch` are cached, on disk as
+well when ``DISCORD_BOT_BGG_CACHE_DIR`` is set so a restart starts warm. Each
+endpoint has its own TTL, and once an entry is older than that it is
+revalidated with the ETag or Last-Modified date BGG sent, falling back to the
+cached result if BGG cannot be reached.
+
+BGG throttles clients that ask too often, so requests are paced by a token
+bucket shared by the whole bot. A circuit breaker stops sending requests for a
+while after several in a row fail, and requests that would wait too long for
+either raise BggUnavailable at once. It is an aiohttp.ClientError, so callers
+that fall back to cached results on network errors do so here too.
+
+Classes:
+    BggClient: Owns the pooled session used for BGG requests.
+    SingleFlight: Shares one in-flight call among identical concurrent calls.
+    TokenBucket: Paces requests to a steady rate with bursts.
+    CircuitBreaker: Stops requests to BGG while it is failing.
+    CachedResponse: A parsed result with the validators needed to revalidate.
+    RequestQueued: Raised when BGG has queued a request to answer later.
+    BggUnavailable: Raised instead of sending a request BGG is unlikely to answer.
+
+Functions:
+    request_key: Normalizes a BGG endpoint and its parameters into a key.
+
+Variables:
+    BASE_URI (str): Base URI for the BGG XML API, DISCORD_BOT_BGG_API_URL
+                    points it elsewhere, such as at bggif.standin.
+    CLIENT (BggClient): The client shared by the bggif modules.
+
+Example usage:
+    await bggif.client.CLIENT.start()
+    games = await bggif.client.CLIENT.request(url, params, parse)
+    await bggif.client.CLIENT.close()
+"""
+import asyncio
+import contextlib
+import os
+import time
+import xml.etree.ElementTree as ET
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, NamedTuple
+
+import aiohttp
+
+import utils
+
+BASE_URI: str = os.getenv('DISCORD_BOT_BGG_API_URL', 'https://www.boardgamegeek.com/xmlapi2/')
+CONNECTIONS_PER_HOST: int = int(os.getenv('DISCORD_BOT_BGG_CONNECTIONS', '8'))
+KEEPALIVE_TIMEOUT: float = 30.0
+DNS_CACHE_TTL: int = 300
+REQUEST_TIMEOUT: float = float(os.getenv('DISCORD_BOT_BGG_TIMEOUT', '15'))
+CONNECT_TIMEOUT: float = 5.0
+CACHE_DIR: str | None = os.getenv('DISCORD_BOT_BGG_CACHE_DIR')
+CACHE_MAX_ENTRIES: int = 1024
+CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+CACHE_KEEP_STALE: float = 7 * 24 * 3600.0
+RATE_LIMIT: float = float(os.getenv('DISCORD_BOT_BGG_RATE', '2'))
+RATE_BURST: int = int(os.getenv('DISCORD_BOT_BGG_BURST', '5'))
+RATE_MAX_WAIT: float = 5.0
+BREAKER_FAILURES: int = 5
+BREAKER_RESET: float = 30.0
+
+
+class BggUnavailable(aiohttp.ClientError):
+    """A request was not sent because BGG is failing or the rate limit would delay it too long."""
+
+
+class TokenBucket:
+    """Paces requests to ``rate`` per second, allowing bursts of ``burst``.
+
+    Each request takes a token, and tokens are replaced at ``rate`` per second
+    up to ``burst``. A request that finds none reserves the next one and
+    waits for it, so waiting requests go out in the order they arrived.
+
+    Methods:
+        acquire: Waits for a token.
+    """
+    def __init__(self, rate: float = RATE_LIMIT, burst: int = RATE_BURST) -> None:
+        self.rate: float = rate
+        self.burst: int = burst
+        self._tokens: float = float(burst)
+        self._updated: float = time.monotonic()
+
+    async def acquire(self, max_wait: float = RATE_MAX_WAIT) -> None:
+        """Waits for a token.
+
+        Parameters:
+            max_wait (float, optional): The longest to wait, in seconds.
+
+        Returns:
+            None
+
+        Raises:
+            BggUnavailable: If the token would take longer than ``max_wait``.
+        """
+        now: float = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        wait: float = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+        if wait > max_wait:
+            raise BggUnavailable('BGG request rate limit reached')
+        self._tokens -= 1
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._tokens += 1
+                raise
+
+
+class CircuitBreaker:
+    """Stops requests to BGG after ``failures`` in a row have failed.
+
+    While the breaker is open requests are refused. After ``reset_after``
+    seconds one trial request is let through, and its outcome closes the
+    breaker or opens it again. A trial that never reports back is given up
+    on after another ``reset_after`` seconds.
+
+    Methods:
+        check: Raises if a request should not be sent.
+        success: Records a request that succeeded.
+        failure: Records a request that failed.
+        is_open: Property that is True while requests are refused.
+    """
+    def __init__(self, failures: int = BREAKER_FAILURES, reset_after: float = BREAKER_RESET) -> None:
+        self.failures: int = failures
+        self.reset_after: float = reset_after
+        self._failed: int = 0
+        self._opened: float | None = None
+        self._trial: float | None = None
+
+    def __repr__(self) -> str:
+        return f'<CircuitBreaker - {"open" if self.is_open else "closed"}, {self._failed} failures>'
+
+    @property
+    def is_open(self) -> bool:
+        """True while requests are refused."""
+        if self._opened is None:
+            return False
+        since: float = self._opened if self._trial is None else self._trial
+        return time.monotonic() - since < self.reset_after
+
+    def check(self) -> None:
+        """Raises if a request should not be sent now.
+
+        Returns:
+            None
+
+        Raises:
+            BggUnavailable: If the breaker is open.
+        """
+        if self._opened is None:
+            return
+        if self.is_open:
+            raise BggUnavailable('BGG is not responding')
+        self._trial = time.monotonic()
+
+    def success(self) -> None:
+        """Records a successful request, closing the breaker."""
+        self._failed = 0
+        self._opened = None
+        self._trial = None
+
+    def failure(self) -> None:
+        """Records a failed request, opening the breaker if there have been too many."""
+        self._failed += 1
+        if self._trial is not None or self._failed >= self.failures:
+            self._opened = time.monotonic()
+        self._trial = None
+
+
+def request_key(endpoint: str, params: dict[str, Any] | None = None) -> tuple:
+    """Normalizes a BGG endpoint and its query parameters into a hashable key.
+
+    BGG treats names and queries without regard to case or surrounding
+    whitespace, so ``bgg_search Catan`` and ``bgg_search catan `` share a key.
+
+    Parameters:
+        endpoint (str): The API endpoint, such as 'search'.
+        params (dict[str, Any], optional): The query parameters.
+
+    Returns:
+        tuple: The normalized key.
+
+    Raises:
+        None
+    """
+    items: tuple = tuple(sorted((str(k).lower(), str(v).strip().lower())
+                                for k, v in (params or {}).items()))
+    return endpoint.strip('/').lower(), items
+
+
+class SingleFlight:
+    """Shares one in-flight call among concurrent calls with the same key.
+
+    The first caller for a key starts the call, callers arriving before it
+    finishes wait on the same task and receive the same result or exception.
+    A caller being cancelled does not cancel the shared call.
+
+    Methods:
+        do: Runs a call, or joins the one already running for the key.
+    """
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args) -> Any:
+        """Runs ``fn(*args)`` unless a call for ``key`` is already running.
+
+        Parameters:
+            key (Hashable): Identifies calls that can share a result.
+            fn (Callable): The coroutine function to call.
+            *args: The arguments for ``fn``.
+
+        Returns:
+            Any: The result of the shared call.
+
+        Raises:
+            Exception: Whatever the shared call raised.
+        """
+        task: asyncio.Task | None = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args))
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+
+class RequestQueued(Exception):
+    """BGG answered 202 Accepted, the result is being prepared and must be requested again."""
+
+
+class CachedResponse(NamedTuple):
+    """A parsed BGG result and the validators needed to revalidate it."""
+    value: Any
+    fetched: float
+    etag: str | None = None
+    last_modified: str | None = None
+    size: int = 0
+
+    @property
+    def age(self) -> float:
+        """Seconds since the result was fetched or last revalidated."""
+        return time.time() - self.fetched
+
+
+class BggClient:
+    """Owns the pooled HTTP session used for BGG requests.
+
+    Attributes:
+        connections_per_host (int): The most connections kept open to BGG.
+        timeout (aiohttp.ClientTimeout): The timeouts applied to each request.
+        in_flight (SingleFlight): Coalesces identical concurrent requests.
+        rate_limit (TokenBucket): Paces every request.
+        breaker (CircuitBreaker): Refuses requests while BGG is failing.
+        cache (utils.TTLCache): Parsed results of :meth:`fetch`, kept for a
+            week after they go stale so they can be revalidated.
+
+    Methods:
+        start: Creates the session.
+        close: Closes the session and its pooled connections.
+        request: Gets and parses a BGG response.
+        fetch: Gets and parses a BGG response through the cache.
+        session: Property that returns the session, creating it if needed.
+    """
+    def __init__(self, connections_per_host: int = CONNECTIONS_PER_HOST,
+                 request_timeout: float = REQUEST_TIMEOUT,
+                 connect_timeout: float = CONNECT_TIMEOUT,
+                 cache_dir: str | None = CACHE_DIR) -> None:
+        self.connections_per_host: int = connections_per_host
+        self.timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(
+            total=request_timeout,
+            sock_connect=connect_timeout,
+        )
+        self.in_flight: SingleFlight = SingleFlight()
+        self.rate_limit: TokenBucket = TokenBucket()
+        self.breaker: CircuitBreaker = CircuitBreaker()
+        self.cache: utils.TTLCache = utils.TTLCache(
+            max_entries=CACHE_MAX_ENTRIES,
+            ttl=CACHE_KEEP_STALE,
+            max_bytes=CACHE_MAX_BYTES,
+            directory=cache_dir,
+            max_disk_entries=4 * CACHE_MAX_ENTRIES,
+        )
+        self._session: aiohttp.ClientSession | None = None
+
+    def __repr__(self) -> str:
+        state: str = 'open' if self._session and not self._session.closed else 'closed'
+        return f'<BggClient - {state}>'
+
+    async def start(self) -> None:
+        """Creates the pooled session if it is not already open.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        self.session
+
+    async def close(self) -> None:
+        """Closes the session and the connections it holds open.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The pooled session.
+
+        The session is created on first use if :meth:`start` has not been
+        called, which must happen inside a running event loop.
+
+        Returns:
+            aiohttp.ClientSession: The shared session.
+
+        Raises:
+            None
+        """
+        if self._session is None or self._session.closed:
+            connector: aiohttp.TCPConnector = aiohttp.TCPConnector(
+                limit_per_host=self.connections_per_host,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    @contextlib.asynccontextmanager
+    async def _get(self, uri: str, params: dict[str, str] | None = None,
+                   headers: dict[str, str] | None = None) -> AsyncIterator[aiohttp.ClientResponse]:
+        self.breaker.check()
+        await self.rate_limit.acquire()
+        try:
+            async with self.session.get(uri, params=params, headers=headers) as response:
+                if response.status == 429 or response.status >= 500:
+                    self.breaker.failure()
+                else:
+                    self.breaker.success()
+                yield response
+        except BggUnavailable:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.breaker.failure()
+            raise
+
+    async def request(self, uri: str, params: dict[str, str] | None,
+                      parse: Callable[[aiohttp.ClientResponse], Awaitable[Any]]) -> Any:
+        """Gets a BGG response and parses it, without caching the result.
+
+        Concurrent identical calls share one request.
+
+        Parameters:
+            uri (str): The API endpoint URI.
+            params (dict[str, str], optional): The query parameters.
+            parse (Callable[[aiohttp.ClientResponse], Awaitable[Any]]): Reads
+                a successful response into a result.
+
+        Returns:
+            Any: The parsed result, or None if BGG did not answer with 200 OK.
+
+        Raises:
+            RequestQueued: If BGG answered 202 Accepted.
+            BggUnavailable: If BGG is failing or the rate limit is exceeded.
+            aiohttp.ClientError: If BGG cannot be reached.
+            asyncio.TimeoutError: If BGG timed out.
+        """
+        return await self.in_flight.do(request_key(uri, params), self._request, uri, params, parse)
+
+    async def _request(self, uri: str, params: dict[str, str] | None,
+                       parse: Callable[[aiohttp.ClientResponse], Awaitable[Any]]) -> Any:
+        async with self._get(uri, params) as response:
+            if response.status == 202:
+                raise RequestQueued(uri)
+            if response.status != 200:
+                return None
+            return await parse(response)
+
+    async def fetch(self, uri: str, params: dict[str, str] | None,
+                    parse: Callable[[aiohttp.ClientResponse], Awaitable[Any]], ttl: float) -> Any:
+        """Gets a BGG response and parses it, answering from the cache when possible.
+
+        A cached result younger than ``ttl`` is returned without a request.
+        An older one is revalidated, a 304 Not Modified reply keeps it for
+        another ``ttl``. If BGG fails, cannot be reached or sends XML that does
+        not parse, the stale result is returned instead. Concurrent identical calls share one request.
+
+        Parameters:
+            uri (str): The API endpoint URI.
+            params (dict[str, str], optional): The query parameters.
+            parse (Callable[[aiohttp.ClientResponse], Awaitable[Any]]): Reads
+                a successful response into a picklable result, which is only
+                cached if it is not None.
+            ttl (float): Seconds the result is used without revalidating it.
+
+        Returns:
+            Any: The parsed result, or None if BGG did not answer with 200 OK
+                 and nothing was cached.
+
+        Raises:
+            BggUnavailable: If BGG is failing, answered 429 or 5xx, sent XML
+                that does not parse, or the rate limit is exceeded, and
+                nothing was cached.
+            aiohttp.ClientError: If BGG cannot be reached and nothing was cached.
+            asyncio.TimeoutError: If BGG timed out and nothing was cached.
+        """
+        key: tuple = request_key(uri, params)
+        return await self.in_flight.do(key, self._fetch, key, uri, params, parse, ttl)
+
+    async def _fetch(self, key: tuple, uri: str, params: dict[str, str] | None,
+                     parse: Callable[[aiohttp.ClientResponse], Awaitable[Any]], ttl: float) -> Any:
+        cached: CachedResponse | None = self.cache.get(key)
+        if cached and cached.age < ttl:
+            return cached.value
+
+        headers: dict[str, str] = {}
+        if cached and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+        try:
+            async with self._get(uri, params, headers) as response:
+                if response.status == 304 and cached:
+                    self.cache.put(key, cached._replace(fetched=time.time()), size=cached.size)
+                    return cached.value
+                if response.status != 200:
+                    if cached:
+                        return cached.value
+                    if response.status == 429 or response.status >= 500:
+                        raise BggUnavailable(f'BGG answered {response.status}')
+                    return None
+                value: Any = await parse(response)
+                size: int = response.content.total_bytes
+                etag: str | None = response.headers.get('ETag')
+                last_modified: str | None = response.headers.get('Last-Modified')
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if cached:
+                return cached.value
+            raise
+        except ET.ParseError as e:
+            if cached:
+                return cached.value
+            raise BggUnavailable(f'BGG sent a response that does not parse: {e}') from e
+
+        if value is not None:
+            self.cache.put(key, CachedResponse(value, time.time(), etag, last_modified, size), size=size)
+        return value
+
+
+CLIENT: BggClient = BggClient()
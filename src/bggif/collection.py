@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""A module for retrieving user collections from the BoardGameGeek (BGG) API.
+
+BGG builds collections on demand. The first request for a collection is
+usually answered with 202 Accepted and the client is expected to ask again
+later. The CollectionScheduler polls queued collections with exponential
+backoff and full jitter, and caps how many polls are running at once across
+every user. A finished collection is parsed into CollectionItem models as it
+streams in and cached per user.
+
+Classes:
+    CollectionItem: A game in a user's collection.
+    CollectionScheduler: Polls queued collection requests until they finish.
+
+Functions:
+    get_collection: Retrieves the games a user owns.
+
+Variables:
+    BASE_URI (str): Base URI for the BoardGameGeek (BGG) XML API, see bggif.client.
+    SITE_BASE_URL (str): Base URL for BGG game pages.
+    COLLECTION_TTL (float): Seconds a cached collection is used before refetching.
+    SCHEDULER (CollectionScheduler): The scheduler shared by every caller.
+
+Example usage:
+    games = await get_collection('username')
+    for game in games:
+        print(game.name, game.num_plays)
+"""
+import asyncio
+import random
+import time
+import xml.etree.ElementTree as ET
+
+from typing import TypeVar
+
+import aiohttp
+
+from .client import BASE_URI, CLIENT, CachedResponse, RequestQueued
+from .model import BggModel
+from .parse import parse_stream
+
+SITE_BASE_URL = 'https://boardgamegeek.com/boardgame/'
+COLLECTION_TTL: float = 6 * 3600.0
+POLL_FIRST_DELAY: float = 2.0
+POLL_MAX_DELAY: float = 60.0
+POLL_MAX_ATTEMPTS: int = 8
+MAX_CONCURRENT_POLLS: int = 4
+
+CollectionItem_Type = TypeVar('CollectionItem_Type', bound='CollectionItem')
+class CollectionItem(BggModel):
+    """A game in a user's collection on BoardGameGeek (BGG).
+
+    Attributes:
+        id (int): The unique identifier of the game.
+        name (str): The name of the game.
+        year_published (int): The publication year of the game.
+        thumbnail (str): The URL of the game's thumbnail image.
+        want_to_play (bool): True if the user wants to play the game.
+        for_trade (bool): True if the user has the game up for trade.
+        num_plays (int): The number of plays the user has logged.
+
+    Methods:
+        from_element: Builds a CollectionItem from a collection item element.
+        to_bytes, from_bytes: Serialize the item, see BggModel.
+        bgg_url: Property that returns the URL of the game on BGG.
+    """
+    __slots__ = ('id', 'name', 'year_published', 'thumbnail', 'want_to_play', 'for_trade',
+                 'num_plays')
+
+    def __init__(self, id: int = 0, name: str = '', year_published: int = 0, thumbnail: str = '',
+                 want_to_play: bool = False, for_trade: bool = False, num_plays: int = 0) -> None:
+        self.id: int = id
+        self.name: str = name
+        self.year_published: int = year_published
+        self.thumbnail: str = thumbnail
+        self.want_to_play: bool = want_to_play
+        self.for_trade: bool = for_trade
+        self.num_plays: int = num_plays
+
+    def __str__(self) -> str:
+        return f'{self.name}'
+
+    def __repr__(self) -> str:
+        return f'<CollectionItem - {self.name}>'
+
+    @classmethod
+    def from_element(cls, element: ET.Element) -> CollectionItem_Type:
+        """Builds a CollectionItem from an ``<item>`` element of a collection.
+
+        Parameters:
+            element (ET.Element): The item element.
+
+        Returns:
+            CollectionItem: The item.
+
+        Raises:
+            None
+        """
+        status: ET.Element | None = element.find('status')
+        flags: dict[str, str] = status.attrib if status is not None else {}
+        return cls(
+            id=int(element.get('objectid') or 0),
+            name=element.findtext('name') or '',
+            year_published=int(element.findtext('yearpublished') or 0),
+            thumbnail=(element.findtext('thumbnail') or '').strip(),
+            want_to_play=flags.get('wanttoplay') == '1',
+            for_trade=flags.get('fortrade') == '1',
+            num_plays=int(element.findtext('numplays') or 0),
+        )
+
+    @property
+    def bgg_url(self) -> str:
+        """The URL of the game on BoardGameGeek (BGG).
+
+        Returns:
+            str: The URL of the game on BGG.
+
+        Raises:
+            None
+        """
+        return SITE_BASE_URL + str(self.id) + '/'
+
+
+class CollectionScheduler:
+    """Polls queued BGG collection requests until BGG has built them.
+
+    Each job asks for its collection, and while BGG answers 202 Accepted waits
+    a random time between zero and a delay that doubles after every attempt,
+    up to ``max_delay``. At most ``max_polls`` requests are outstanding at
+    once however many jobs are waiting, and a job does not hold its place
+    while it sleeps.
+
+    Attributes:
+        first_delay (float): The longest wait, in seconds, after the first 202.
+        max_delay (float): The longest wait between attempts.
+        max_attempts (int): Attempts before a job gives up.
+
+    Methods:
+        run: Polls for a collection until it is ready.
+    """
+    def __init__(self, max_polls: int = MAX_CONCURRENT_POLLS, first_delay: float = POLL_FIRST_DELAY,
+                 max_delay: float = POLL_MAX_DELAY, max_attempts: int = POLL_MAX_ATTEMPTS) -> None:
+        self.first_delay: float = first_delay
+        self.max_delay: float = max_delay
+        self.max_attempts: int = max_attempts
+        self._polls: asyncio.Semaphore = asyncio.Semaphore(max_polls)
+
+    async def run(self, params: dict[str, str]) -> list[CollectionItem] | None:
+        """Requests a collection, polling while BGG prepares it.
+
+        Parameters:
+            params (dict[str, str]): The collection query parameters.
+
+        Returns:
+            list[CollectionItem]: The collection, or None if BGG did not
+                finish it within ``max_attempts`` or answered with an error.
+
+        Raises:
+            aiohttp.ClientError: If BGG cannot be reached.
+            asyncio.TimeoutError: If BGG timed out.
+        """
+        delay: float = self.first_delay
+        for _ in range(self.max_attempts):
+            async with self._polls:
+                try:
+                    return await CLIENT.request(BASE_URI + 'collection', params, _parse_collection)
+                except RequestQueued:
+                    pass
+            await asyncio.sleep(random.uniform(0, delay))
+            delay = min(2 * delay, self.max_delay)
+        return None
+
+
+SCHEDULER: CollectionScheduler = CollectionScheduler()
+
+
+async def get_collection(username: str) -> list[CollectionItem] | None:
+    """Retrieves the board games a BoardGameGeek (BGG) user owns.
+
+    A collection cached less than COLLECTION_TTL seconds ago is returned
+    straight away. Otherwise it is requested through the SCHEDULER, and
+    concurrent requests for the same user share one job. If BGG does not
+    deliver it, or delivers XML that does not parse, the stale cached
+    collection is returned if there is one.
+
+    Parameters:
+        username (str): The BGG username.
+
+    Returns:
+        list[CollectionItem]: The owned games, or None if they could not be
+            retrieved.
+
+    Raises:
+        None
+    """
+    key: tuple = ('collection', username.strip().lower())
+    cached: CachedResponse | None = CLIENT.cache.get(key)
+    if cached and cached.age < COLLECTION_TTL:
+        return cached.value
+
+    parameters: dict[str, str] = {
+        'username': username.strip(),
+        'own': '1',
+        'subtype': 'boardgame',
+        'excludesubtype': 'boardgameexpansion',
+    }
+    try:
+        items: list[CollectionItem] | None = await CLIENT.in_flight.do(key, SCHEDULER.run, parameters)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ET.ParseError):
+        items = None
+    if items is None:
+        return cached.value if cached else None
+
+    size: int = sum(len(item.to_bytes()) for item in items)
+    CLIENT.cache.put(key, CachedResponse(items, time.time(), size=size), size=size)
+    return items
+
+
+async def _parse_collection(response: aiohttp.ClientResponse) -> list[CollectionItem]:
+    return await parse_stream(response, 'item', CollectionItem.from_element)
@@ -9,10 +9,13 @@ generate BGG URLs.
 Classes:
     HotGame: Represents a hot game on BoardGameGeek (BGG), with methods to
              retrieve hot games data and generate BGG URLs.
+    HotList: Keeps the hot games list in memory and refreshes it when stale.
 
 Variables:
-    BASE_URI (str): Base URI for the BoardGameGeek (BGG) XML API.
+    BASE_URI (str): Base URI for the BoardGameGeek (BGG) XML API, see bggif.client.
     SITE_BASE_URL (str): Base URL for BGG game pages.
+    HOT_LIST_TTL (float): Seconds before the cached hot list is stale.
+    HOT_LIST (HotList): The hot list shared by every caller.
 
 Example usage:
     if __name__ == '__main__':
@@ -20,14 +23,21 @@ Example usage:
         for game in hot_games:
             print(game.name, game.rank)
 """
+import asyncio
+import time
+
 import aiohttp
-import xmltodict
+import xml.etree.ElementTree as ET
+
+from .client import BASE_URI, CLIENT
+from .model import BggModel
+from .parse import child_value, parse_stream
 
-BASE_URI = 'https://www.boardgamegeek.com/xmlapi2/'
 SITE_BASE_URL = 'https://boardgamegeek.com/boardgame/'
+HOT_LIST_TTL: float = 900.0
 
 
-class HotGame:
+class HotGame(BggModel):
     """Represents a hot game on BoardGameGeek (BGG) with attributes and methods for interaction.
 
     Attributes:
@@ -39,47 +49,69 @@ class HotGame:
     
     Methods:
         get_hot_games(cls): Asynchronously retrieves hot games data from BGG.
+        from_element(cls): Builds a HotGame from a hot list item element.
+        to_bytes, from_bytes: Serialize the game, see BggModel.
         bgg_url: Property that returns the URL of the game on BGG.
 
     """
-    def __init__(self, **kwargs) -> None:
-        self.id: int = int(kwargs.get('@id', '0'))
-        self.rank: int = int(kwargs.get('@rank', 0))
-        self.thumbnail: str = kwargs.get('thumbnail', '').get('@value', '')
-        self.name: str = kwargs.get('name', '').get('@value', '')
-        self.year_published: int = int(kwargs.get('yearpublished', '0').get('@value', '0'))
+    __slots__ = ('id', 'rank', 'thumbnail', 'name', 'year_published')
+
+    def __init__(self, id: int = 0, rank: int = 0, thumbnail: str = '',
+                 name: str = '', year_published: int = 0) -> None:
+        self.id: int = id
+        self.rank: int = rank
+        self.thumbnail: str = thumbnail
+        self.name: str = name
+        self.year_published: int = year_published
     
     def __str__(self) -> str:
         return f'{self.name}'
     
     def __repr__(self) -> str:
         return f'<HotGame - {self.name}>'
+
+    @classmethod
+    def from_element(cls, element: ET.Element) -> 'HotGame':
+        """Builds a HotGame from an ``<item>`` element of the hot list.
+
+        Parameters:
+            element (ET.Element): The item element.
+
+        Returns:
+            HotGame: The game.
+
+        Raises:
+            None
+        """
+        return cls(
+            id=int(element.get('id') or 0),
+            rank=int(element.get('rank') or 0),
+            thumbnail=child_value(element, 'thumbnail'),
+            name=child_value(element, 'name'),
+            year_published=int(child_value(element, 'yearpublished') or 0),
+        )
     
     @classmethod
     async def get_hot_games(cls) -> list:
         """Asynchronously retrieves hot games data from BoardGameGeek (BGG).
 
-        This method sends a request to the BGG API to fetch data about hot
-        games. If the request is successful (status code 200), the response is
-        parsed as XML. The data is then extracted and used to create HotGame
-        objects, which are returned as a list.
+        This method sends a request to the BGG API, through the shared client,
+        to fetch data about hot games. If the request is successful
+        (status code 200), the response is parsed as it arrives and each item
+        is turned into a HotGame object, which are returned as a list.
 
         Returns:
             list[HotGame]: A list of HotGame objects representing hot games on BGG.
 
         Raises:
-            None
+            aiohttp.ClientError: If BGG cannot be reached or is unavailable.
         """
-        params: str = 'hot?boardgame'
-        full_bgg_url: str = BASE_URI + params
-        game_list: list[HotGame] = None
-        async with aiohttp.ClientSession() as session:
-            async with session.get(full_bgg_url) as response:
-                if response.status == 200:
-                    raw_xml: str = await response.text()
-                    game_data: dict = xmltodict.parse(raw_xml)['items']['item']
-                    game_list = [cls(**i) for i in game_data]
-        return game_list
+        parameters: dict[str, str] = {'type': 'boardgame'}
+        return await CLIENT.request(BASE_URI + 'hot', parameters, cls._parse_hot)
+
+    @classmethod
+    async def _parse_hot(cls, response: aiohttp.ClientResponse) -> list:
+        return await parse_stream(response, 'item', cls.from_element)
 
     @property
     def bgg_url(self) -> str:
@@ -97,5 +129,89 @@ class HotGame:
         return SITE_BASE_URL + str(self.id) + '/'
 
 
+class HotList:
+    """Keeps the BoardGameGeek (BGG) hot games list in memory.
+
+    The list is served from memory. Once it is older than ``ttl`` the stale
+    list is still returned while a refresh runs in the background, and callers
+    that arrive during a refresh share it rather than each asking BGG. If BGG
+    cannot be reached or sends a list that does not parse, the last good list
+    is kept.
+
+    Attributes:
+        ttl (float): Seconds before the list is stale.
+
+    Methods:
+        get: Returns the hot games, fetching them only if none are held.
+        refresh: Fetches the hot games from BGG.
+        stale: Property that is True when the list needs refreshing.
+    """
+    def __init__(self, ttl: float = HOT_LIST_TTL) -> None:
+        self.ttl: float = ttl
+        self._games: list[HotGame] | None = None
+        self._fetched: float = 0.0
+        self._refresh: asyncio.Task | None = None
+
+    def __repr__(self) -> str:
+        count: int = len(self._games) if self._games else 0
+        return f'<HotList - {count} games{", stale" if self.stale else ""}>'
+
+    @property
+    def stale(self) -> bool:
+        """True when the list is missing or older than the TTL.
+
+        Returns:
+            bool: Whether the list should be refreshed.
+
+        Raises:
+            None
+        """
+        return self._games is None or time.monotonic() - self._fetched > self.ttl
+
+    async def get(self) -> list[HotGame] | None:
+        """Returns the hot games list.
+
+        Only the first call waits on BGG, later calls answer from memory and
+        start a background refresh when the list is stale.
+
+        Returns:
+            list[HotGame]: The hot games, or None if BGG has never answered.
+
+        Raises:
+            None
+        """
+        if self._games is None:
+            return await self.refresh()
+        if self.stale and (self._refresh is None or self._refresh.done()):
+            self._refresh = asyncio.create_task(self._fetch())
+        return self._games
+
+    async def refresh(self) -> list[HotGame] | None:
+        """Fetches the hot games from BGG, joining a refresh already running.
+
+        Returns:
+            list[HotGame]: The newest hot games held.
+
+        Raises:
+            None
+        """
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._fetch())
+        return await asyncio.shield(self._refresh)
+
+    async def _fetch(self) -> list[HotGame] | None:
+        try:
+            games: list[HotGame] | None = await HotGame.get_hot_games()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ET.ParseError):
+            games = None
+        if games:
+            self._games = games
+            self._fetched = time.monotonic()
+        return self._games
+
+
+HOT_LIST: HotList = HotList()
+
+
 if __name__ == '__main__':
     print([g.get_site_url for g in HotGame.get_hot_games()])
\ No newline at end of file
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""A common base for the BoardGameGeek (BGG) model classes.
+
+The models keep their fields in ``__slots__`` rather than an instance
+dictionary, and serialize to a compact bytes form: a JSON array of the field
+values in slot order. That form is also what pickle stores, so models held in
+the bggif cache stay small on disk.
+
+Classes:
+    BggModel: Base class giving slotted models equality, repr and bytes
+              serialization.
+
+Example usage:
+    data = game.to_bytes()
+    assert HotGame.from_bytes(data) == game
+"""
+import datetime
+import json
+
+from typing import Any, TypeVar
+
+BggModel_Type = TypeVar('BggModel_Type', bound='BggModel')
+
+
+class BggModel:
+    """Base class for slotted BGG models.
+
+    Subclasses list their fields in ``__slots__`` and must accept them
+    positionally, in the same order, in ``__init__``. Dates are serialized as
+    ISO 8601 strings, so ``__init__`` must accept those too.
+
+    Methods:
+        to_bytes: Serializes the model.
+        from_bytes: Builds a model from its serialized form.
+    """
+    __slots__ = ()
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self) -> int:
+        return hash((type(self), getattr(self, 'id', None)))
+
+    def __reduce__(self) -> tuple:
+        return (type(self).from_bytes, (self.to_bytes(),))
+
+    def to_bytes(self) -> bytes:
+        """Serializes the model.
+
+        Returns:
+            bytes: A JSON array of the field values in slot order.
+
+        Raises:
+            None
+        """
+        values: list[Any] = [getattr(self, name) for name in self.__slots__]
+        return json.dumps(values, separators=(',', ':'), ensure_ascii=False,
+                          default=_encode).encode('utf-8')
+
+    @classmethod
+    def from_bytes(cls: type[BggModel_Type], data: bytes) -> BggModel_Type:
+        """Builds a model from the bytes returned by :meth:`to_bytes`.
+
+        Parameters:
+            data (bytes): The serialized model.
+
+        Returns:
+            BggModel: The model.
+
+        Raises:
+            ValueError: If the data is not a serialized model.
+        """
+        return cls(*json.loads(data))
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
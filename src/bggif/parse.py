@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Incremental parsing of BoardGameGeek (BGG) XML API responses.
+
+Responses are fed to a pull parser as they arrive from the network, and each
+complete element of interest is handed to a builder that turns it into a model
+object straight away. Parsing stops as soon as enough objects are built, so
+the rest of a long response is neither downloaded nor parsed.
+
+Functions:
+    parse_stream: Builds objects from the matching elements of a response.
+    child_value: Returns the value attribute of an element's child.
+
+Example usage:
+    async with session.get(url) as response:
+        games = await parse_stream(response, 'item', HotGame.from_element)
+"""
+import xml.etree.ElementTree as ET
+
+from typing import Callable, Iterator, TypeVar
+
+import aiohttp
+
+STREAM_CHUNK_SIZE: int = 16 * 1024
+
+T = TypeVar('T')
+
+
+async def parse_stream(response: aiohttp.ClientResponse, tag: str,
+                       build: Callable[[ET.Element], T | None],
+                       limit: int | None = None) -> list[T]:
+    """Parses an XML response as it arrives and builds an object per element.
+
+    Parameters:
+        response (aiohttp.ClientResponse): The response to read.
+        tag (str): The tag of the elements to build objects from.
+        build (Callable[[ET.Element], T | None]): Builds an object from a
+            complete element, or returns None to skip the element.
+        limit (int, optional): Stop building once this many objects are
+            built. The rest of the body is still read, without parsing, so
+            the connection can go back to the pool.
+
+    Returns:
+        list[T]: The objects built, in document order.
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the response is not valid XML.
+    """
+    parser: ET.XMLPullParser = ET.XMLPullParser(events=('end',))
+    results: list[T] = []
+
+    def collect() -> bool:
+        for element in _completed(parser, tag):
+            item: T | None = build(element)
+            element.clear()
+            if item is not None:
+                results.append(item)
+                if limit is not None and len(results) >= limit:
+                    return True
+        return False
+
+    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+        parser.feed(chunk)
+        if collect():
+            async for _ in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                pass
+            return results
+    parser.close()
+    collect()
+    return results
+
+
+def _completed(parser: ET.XMLPullParser, tag: str) -> Iterator[ET.Element]:
+    for _, element in parser.read_events():
+        if element.tag == tag:
+            yield element
+
+
+def child_value(element: ET.Element, tag: str, default: str = '') -> str:
+    """Returns the value attribute of the first child with the given tag.
+
+    BGG puts most fields in a ``value`` attribute, as in
+    ``<yearpublished value="1995"/>``.
+
+    Parameters:
+        element (ET.Element): The parent element.
+        tag (str): The tag of the child.
+        default (str, optional): Returned if there is no such child or value.
+
+    Returns:
+        str: The value.
+
+    Raises:
+        None
+    """
+    child: ET.Element | None = element.find(tag)
+    if child is None:
+        return default
+    return child.get('value', default)
@@ -12,8 +12,9 @@ Classes:
                 methods to perform searches and generate BGG URLs.
 
 Variables:
-    BASE_URI (str): Base URI for the BoardGameGeek (BGG) XML API.
+    BASE_URI (str): Base URI for the BoardGameGeek (BGG) XML API, see bggif.client.
     SITE_BASE_URL (str): Base URL for BGG game pages.
+    SEARCH_TTL (float): Seconds a cached search is used before revalidating it.
 
 Example usage:
     search_results = await SearchItem.search('Catan')
@@ -22,15 +23,20 @@ Example usage:
 """
 
 import aiohttp
-import xmltodict
+import xml.etree.ElementTree as ET
 from typing import TypeVar
 
-BASE_URI = 'https://www.boardgamegeek.com/xmlapi2/'
+from .client import BASE_URI, CLIENT
+from .model import BggModel
+from .parse import child_value, parse_stream
+
 SITE_BASE_URL = 'https://boardgamegeek.com/boardgame/'
+SEARCH_TTL: float = 24 * 3600.0
+SEARCH_MAX_RESULTS: int = 10
 
 
 SearchItem_Type =  TypeVar('SearchItem_Type', bound='SearchItem')
-class SearchItem:
+class SearchItem(BggModel):
     """Represents an item obtained from a search query on BoardGameGeek (BGG).
 
     Attributes:
@@ -40,6 +46,8 @@ class SearchItem:
 
     Methods:
         search: Asynchronously searches BGG for items matching the specified query.
+        from_element: Builds a SearchItem from a search result element.
+        to_bytes, from_bytes: Serialize the item, see BggModel.
         bgg_url: Property that returns the URL of the item on BGG.
 
     Example usage:
@@ -47,20 +55,40 @@ class SearchItem:
         for item in search_results:
             print(item.name, item.bgg_url)
     """
+    __slots__ = ('id', 'name', 'year_published')
 
-    def __init__(self, **kwargs) -> None:
-        print(kwargs)
-        self.id = int(kwargs.get('@id', '0'))
-        self.name = kwargs.get('name', '').get('@value', '')
-        self.year_published = None
-        if 'yearpublished' in kwargs.keys():
-            self.year_published = int(kwargs['yearpublished'].get('@value', '0'))
+    def __init__(self, id: int = 0, name: str = '', year_published: int | None = None) -> None:
+        self.id: int = id
+        self.name: str = name
+        self.year_published: int | None = year_published
     
     def __str__(self) -> str:
         return f'{self.name}'
     
     def __repr__(self) -> str:
         return f'<Item - {self.name}>'
+
+    @classmethod
+    def from_element(cls, element: ET.Element) -> SearchItem_Type | None:
+        """Builds a SearchItem from an ``<item>`` element of a search result.
+
+        Parameters:
+            element (ET.Element): The item element.
+
+        Returns:
+            SearchItem: The item, or None if it has no publication year.
+
+        Raises:
+            None
+        """
+        year_published: str = child_value(element, 'yearpublished')
+        if not year_published:
+            return None
+        return cls(
+            id=int(element.get('id') or 0),
+            name=child_value(element, 'name'),
+            year_published=int(year_published),
+        )
     
     @classmethod
     async def search(cls, search_str: str='') -> list[SearchItem_Type]:
@@ -71,13 +99,15 @@ class SearchItem:
         before being used as a query parameter in the API request.
         
         If the request is successful (status code 200), the response is parsed
-        as XML. The search results are extracted and filtered to include only
-        items with publication year information.
+        as it arrives. The search results are filtered to include only items
+        with publication year information.
         
-        If there are more than 10 results, only the first 10 are returned.
+        Only the first 10 results are returned, the response is not read past
+        them.
         
         The search results are then converted into SearchItem objects and
-        returned as a list.
+        returned as a list. Results are cached for SEARCH_TTL seconds and
+        identical searches made while one is in flight share its request.
 
         Parameters:
             search_str (str, optional): The search query string. Defaults to an empty string.
@@ -86,23 +116,18 @@ class SearchItem:
             list[SearchItem]: A list of SearchItem objects representing search results from BGG.
 
         Raises:
-            None
+            bggif.client.BggUnavailable: If BGG is failing and the search is not cached.
+            aiohttp.ClientError: If BGG cannot be reached and the search is not cached.
         """
-        cleaned_search: str = search_str.replace(' ', '+')
-        uri: str = BASE_URI + 'search'
+        cleaned_search: str = search_str.strip().replace(' ', '+')
         parameters: dict[str, str] = {'query':cleaned_search}
-        results: list[SearchItem] = []
-        async with aiohttp.ClientSession() as session:
-            async with session.get(uri, params=parameters) as response:
-                if response.status == 200:
-                    raw_xml = await response.text()
-                    results = xmltodict.parse(raw_xml)['items'].get('item', None)
-                    results = [result for result in results if 'yearpublished' in result.keys()]
-                    if results and len(results) > 10:
-                        results = results[:10]
-                    if results:
-                        results = [SearchItem(**result) for result in results]
-        return results
+        results: list[SearchItem] | None = await CLIENT.fetch(BASE_URI + 'search', parameters,
+                                                              cls._parse_search, SEARCH_TTL)
+        return results or []
+
+    @classmethod
+    async def _parse_search(cls, response: aiohttp.ClientResponse) -> list[SearchItem_Type]:
+        return await parse_stream(response, 'item', cls.from_element, limit=SEARCH_MAX_RESULTS)
 
     @property
     def bgg_url(self) -> str:
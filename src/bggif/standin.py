@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""A local stand-in for the BoardGameGeek (BGG) XML API.
+
+The stand-in serves recorded XML for the hot, search, user, thing and
+collection endpoints so the bggif parsing, caching and pooling can be
+exercised and measured without boardgamegeek.com. It can add latency and
+errors to responses, answers collection requests with 202 Accepted a set
+number of times before delivering them as BGG does, and honors
+If-None-Match so cache revalidation can be measured too.
+
+Responses come from the fixtures directory. A request is answered with
+``<endpoint>/<values>.xml``, where values are the lower-cased query parameter
+values joined by '_', if that file exists and ``<endpoint>.xml`` otherwise.
+Thing requests answered from ``thing.xml`` only include the items asked for.
+With ``--record`` a missing ``<endpoint>/<values>.xml`` is fetched from BGG
+and saved first.
+
+Classes:
+    StandIn: The fake API and its settings.
+
+Variables:
+    FIXTURE_DIR (Path): The fixtures shipped in resources/bgg.
+    LIVE_URI (str): The real BGG XML API, used when recording.
+
+Example usage, from the src directory:
+    python -m bggif.standin --port 8080 --latency 0.25 --error-rate 0.05
+
+and run the bot against it with
+    DISCORD_BOT_BGG_API_URL=http://127.0.0.1:8080/xmlapi2/
+"""
+import argparse
+import asyncio
+import collections
+import hashlib
+import logging
+import random
+import re
+import xml.etree.ElementTree as ET
+
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+FIXTURE_DIR: Path = Path(__file__).resolve().parents[2] / 'resources' / 'bgg'
+LIVE_URI: str = 'https://boardgamegeek.com/xmlapi2/'
+ENDPOINTS: tuple[str, ...] = ('hot', 'search', 'user', 'thing', 'collection')
+QUEUED_ENDPOINTS: tuple[str, ...] = ('collection',)
+QUEUED_MESSAGE: bytes = (b'<?xml version="1.0" encoding="utf-8"?>'
+                         b'<message>Your request for this collection has been accepted and will be '
+                         b'processed.  Please try again later for access.</message>')
+ERROR_MESSAGE: bytes = b'<?xml version="1.0" encoding="utf-8"?><error><message>Injected error</message></error>'
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class StandIn:
+    """A fake BGG XML API served by aiohttp.
+
+    Attributes:
+        fixtures (Path): The directory holding the recorded responses.
+        latency (float): Seconds added to every response.
+        jitter (float): Up to this many more seconds added at random.
+        error_rate (float): The fraction of requests answered with an error.
+        error_status (int): The HTTP status of injected errors.
+        queue_polls (int): How many times each distinct collection request
+            is answered with 202 Accepted before it is delivered.
+        record (bool): Fetch and save responses missing from the fixtures.
+        requests (collections.Counter): Requests served, by endpoint.
+
+    Methods:
+        app: Builds the aiohttp application.
+        handle: Answers one API request.
+    """
+    def __init__(self, fixtures: Path = FIXTURE_DIR, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, queue_polls: int = 2,
+                 record: bool = False, seed: int | None = None) -> None:
+        self.fixtures: Path = Path(fixtures)
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.error_rate: float = error_rate
+        self.error_status: int = error_status
+        self.queue_polls: int = queue_polls
+        self.record: bool = record
+        self.requests: collections.Counter = collections.Counter()
+        self._polls: collections.Counter = collections.Counter()
+        self._random: random.Random = random.Random(seed)
+        self._files: dict[Path, bytes] = {}
+        self._things: dict[str, bytes] | None = None
+
+    def __repr__(self) -> str:
+        return f'<StandIn - {self.fixtures}, {sum(self.requests.values())} requests>'
+
+    def app(self) -> web.Application:
+        """Builds the aiohttp application serving the API under /xmlapi2/.
+
+        Returns:
+            web.Application: The application.
+
+        Raises:
+            None
+        """
+        app: web.Application = web.Application()
+        app.router.add_get('/xmlapi2/{endpoint}', self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Answers one API request.
+
+        Parameters:
+            request (web.Request): The request.
+
+        Returns:
+            web.Response: The recorded response, a 202, a 304 or an error.
+
+        Raises:
+            None
+        """
+        endpoint: str = request.match_info['endpoint']
+        if endpoint not in ENDPOINTS:
+            raise web.HTTPNotFound()
+        self.requests[endpoint] += 1
+
+        delay: float = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self._random.random() < self.error_rate:
+            return web.Response(status=self.error_status, body=ERROR_MESSAGE, content_type='text/xml')
+
+        query: list[tuple[str, str]] = sorted(request.query.items())
+        if endpoint in QUEUED_ENDPOINTS:
+            key: tuple = (endpoint, tuple(query))
+            self._polls[key] += 1
+            if self._polls[key] <= self.queue_polls:
+                return web.Response(status=202, body=QUEUED_MESSAGE, content_type='text/xml')
+
+        body: bytes | None = await self._fixture(endpoint, query)
+        if body is None:
+            raise web.HTTPNotFound()
+        etag: str = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(body=body, content_type='text/xml', charset='utf-8', headers={'ETag': etag})
+
+    async def _fixture(self, endpoint: str, query: list[tuple[str, str]]) -> bytes | None:
+        slug: str = re.sub(r'[^a-z0-9,._-]+', '-', '_'.join(v.lower() for _, v in query)) or 'default'
+        path: Path = self.fixtures / endpoint / f'{slug}.xml'
+        if not path.exists() and self.record:
+            await self._record(endpoint, query, path)
+        if path.exists():
+            return self._read(path)
+        if endpoint == 'thing':
+            return self._select_things(dict(query).get('id', ''))
+        path = self.fixtures / f'{endpoint}.xml'
+        return self._read(path) if path.exists() else None
+
+    def _read(self, path: Path) -> bytes:
+        if path not in self._files:
+            self._files[path] = path.read_bytes()
+        return self._files[path]
+
+    def _select_things(self, ids: str) -> bytes | None:
+        path: Path = self.fixtures / 'thing.xml'
+        if not path.exists():
+            return None
+        if self._things is None:
+            root: ET.Element = ET.fromstring(self._read(path))
+            self._things = {item.get('id'): ET.tostring(item, encoding='utf-8', xml_declaration=False)
+                            for item in root.iter('item')}
+        items: list[bytes] = [self._things[id] for id in ids.split(',') if id in self._things]
+        return (b'<?xml version="1.0" encoding="utf-8"?>'
+                b'<items termsofuse="https://boardgamegeek.com/xmlapi/termsofuse">'
+                + b''.join(items) + b'</items>')
+
+    async def _record(self, endpoint: str, query: list[tuple[str, str]], path: Path) -> None:
+        async with aiohttp.ClientSession() as session:
+            for _ in range(5):
+                async with session.get(LIVE_URI + endpoint, params=query) as response:
+                    if response.status == 202:
+                        await asyncio.sleep(5)
+                        continue
+                    if response.status != 200:
+                        logger.warning(f'Not recording {endpoint} {query}: HTTP {response.status}')
+                        return
+                    body: bytes = await response.read()
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(body)
+                logger.info(f'Recorded {path}')
+                return
+
+
+def main() -> None:
+    """Runs the stand-in from the command line."""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fixtures', type=Path, default=FIXTURE_DIR,
+                        help='Directory of recorded responses.')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds added to every response.')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Up to this many more seconds added at random.')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with an error.')
+    parser.add_argument('--error-status', type=int, default=503,
+                        help='HTTP status of injected errors.')
+    parser.add_argument('--queue-polls', type=int, default=2,
+                        help='Times each collection request is answered with 202 first.')
+    parser.add_argument('--record', action='store_true',
+                        help='Fetch and save responses missing from the fixtures.')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed for the injected latency and errors.')
+    args: argparse.Namespace = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    standin: StandIn = StandIn(args.fixtures, args.latency, args.jitter, args.error_rate,
+                               args.error_status, args.queue_polls, args.record, args.seed)
+    web.run_app(standin.app(), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""A module for retrieving game details from the BoardGameGeek (BGG) thing API.
+
+The thing endpoint returns details and statistics for up to THING_BATCH_SIZE
+games per request. Callers ask for any number of games at once, the ones with
+fresh details in the client cache are answered from there and the rest are
+fetched in as few requests as the batch size allows, all at the same time.
+
+Classes:
+    GameDetails: The details and statistics of a game on BGG.
+
+Functions:
+    get_things: Retrieves the details of several games.
+
+Variables:
+    BASE_URI (str): Base URI for the BoardGameGeek (BGG) XML API, see bggif.client.
+    SITE_BASE_URL (str): Base URL for BGG game pages.
+    THING_TTL (float): Seconds cached game details are used before refetching.
+    THING_BATCH_SIZE (int): The most IDs BGG accepts in one thing request.
+
+Example usage:
+    details = await get_things([13, 822])
+    print(details[13].rating, details[13].rank)
+"""
+import asyncio
+import time
+import xml.etree.ElementTree as ET
+
+from typing import Iterable, TypeVar
+
+import aiohttp
+
+from .client import BASE_URI, CLIENT, CachedResponse
+from .model import BggModel
+from .parse import child_value, parse_stream
+
+SITE_BASE_URL = 'https://boardgamegeek.com/boardgame/'
+THING_TTL: float = 24 * 3600.0
+THING_BATCH_SIZE: int = 20
+
+GameDetails_Type = TypeVar('GameDetails_Type', bound='GameDetails')
+class GameDetails(BggModel):
+    """The details and statistics of a game on BoardGameGeek (BGG).
+
+    Attributes:
+        id (int): The unique identifier of the game.
+        name (str): The primary name of the game.
+        year_published (int): The publication year of the game.
+        thumbnail (str): The URL of the game's thumbnail image.
+        min_players (int): The fewest players the game supports.
+        max_players (int): The most players the game supports.
+        playing_time (int): The playing time in minutes.
+        rating (float): The average user rating.
+        users_rated (int): The number of users who rated the game.
+        rank (int): The overall board game rank, 0 if the game is not ranked.
+        weight (float): The average complexity weight, from 1 to 5.
+
+    Methods:
+        from_element: Builds GameDetails from a thing item element.
+        to_bytes, from_bytes: Serialize the details, see BggModel.
+        bgg_url: Property that returns the URL of the game on BGG.
+        players: Property that returns the player count range.
+    """
+    __slots__ = ('id', 'name', 'year_published', 'thumbnail', 'min_players', 'max_players',
+                 'playing_time', 'rating', 'users_rated', 'rank', 'weight')
+
+    def __init__(self, id: int = 0, name: str = '', year_published: int = 0, thumbnail: str = '',
+                 min_players: int = 0, max_players: int = 0, playing_time: int = 0,
+                 rating: float = 0.0, users_rated: int = 0, rank: int = 0, weight: float = 0.0) -> None:
+        self.id: int = id
+        self.name: str = name
+        self.year_published: int = year_published
+        self.thumbnail: str = thumbnail
+        self.min_players: int = min_players
+        self.max_players: int = max_players
+        self.playing_time: int = playing_time
+        self.rating: float = rating
+        self.users_rated: int = users_rated
+        self.rank: int = rank
+        self.weight: float = weight
+
+    def __str__(self) -> str:
+        return f'{self.name}'
+
+    def __repr__(self) -> str:
+        return f'<GameDetails - {self.name}>'
+
+    @classmethod
+    def from_element(cls, element: ET.Element) -> GameDetails_Type:
+        """Builds GameDetails from an ``<item>`` element of a thing response.
+
+        Parameters:
+            element (ET.Element): The item element, requested with stats=1.
+
+        Returns:
+            GameDetails: The details.
+
+        Raises:
+            None
+        """
+        name: ET.Element | None = element.find("name[@type='primary']")
+        rank: ET.Element | None = element.find("statistics/ratings/ranks/rank[@name='boardgame']")
+        rank_value: str = rank.get('value', '') if rank is not None else ''
+        return cls(
+            id=int(element.get('id') or 0),
+            name=name.get('value', '') if name is not None else '',
+            year_published=int(child_value(element, 'yearpublished') or 0),
+            thumbnail=(element.findtext('thumbnail') or '').strip(),
+            min_players=int(child_value(element, 'minplayers') or 0),
+            max_players=int(child_value(element, 'maxplayers') or 0),
+            playing_time=int(child_value(element, 'playingtime') or 0),
+            rating=float(child_value(element, 'statistics/ratings/average') or 0),
+            users_rated=int(child_value(element, 'statistics/ratings/usersrated') or 0),
+            rank=int(rank_value) if rank_value.isdigit() else 0,
+            weight=float(child_value(element, 'statistics/ratings/averageweight') or 0),
+        )
+
+    @property
+    def bgg_url(self) -> str:
+        """The URL of the game on BoardGameGeek (BGG).
+
+        Returns:
+            str: The URL of the game on BGG.
+
+        Raises:
+            None
+        """
+        return SITE_BASE_URL + str(self.id) + '/'
+
+    @property
+    def players(self) -> str:
+        """The player count range, such as '3-4' or '2'.
+
+        Returns:
+            str: The range, or an empty string if BGG does not list one.
+
+        Raises:
+            None
+        """
+        if not self.max_players or self.min_players == self.max_players:
+            return str(self.min_players) if self.min_players else ''
+        return f'{self.min_players}-{self.max_players}'
+
+
+async def get_things(ids: Iterable[int]) -> dict[int, GameDetails]:
+    """Retrieves the details of several games from BoardGameGeek (BGG).
+
+    Duplicate IDs are requested once. Details cached less than THING_TTL
+    seconds ago are used as they are, the rest are requested in batches of
+    THING_BATCH_SIZE that run concurrently. If a batch fails, stale cached
+    details are used for its games where there are any.
+
+    Parameters:
+        ids (Iterable[int]): The BGG IDs of the games.
+
+    Returns:
+        dict[int, GameDetails]: The details found, keyed by ID in the order
+            the IDs were given.
+
+    Raises:
+        None
+    """
+    wanted: list[int] = list(dict.fromkeys(ids))
+    found: dict[int, GameDetails] = {}
+    stale: dict[int, GameDetails] = {}
+    missing: list[int] = []
+    for id in wanted:
+        cached: CachedResponse | None = CLIENT.cache.get(('thing', id))
+        if cached and cached.age < THING_TTL:
+            found[id] = cached.value
+        else:
+            if cached:
+                stale[id] = cached.value
+            missing.append(id)
+
+    batches: list[list[int]] = [missing[i:i + THING_BATCH_SIZE]
+                                for i in range(0, len(missing), THING_BATCH_SIZE)]
+    results: list = await asyncio.gather(*[_get_batch(batch) for batch in batches],
+                                         return_exceptions=True)
+    for batch, result in zip(batches, results):
+        if isinstance(result, BaseException) or result is None:
+            found.update({id: stale[id] for id in batch if id in stale})
+            continue
+        for details in result:
+            found[details.id] = details
+            CLIENT.cache.put(('thing', details.id), CachedResponse(details, time.time()),
+                             size=len(details.to_bytes()))
+
+    return {id: found[id] for id in wanted if id in found}
+
+
+async def _get_batch(ids: list[int]) -> list[GameDetails] | None:
+    parameters: dict[str, str] = {'id': ','.join(str(id) for id in sorted(ids)), 'stats': '1'}
+    return await CLIENT.request(BASE_URI + 'thing', parameters, _parse_things)
+
+
+async def _parse_things(response: aiohttp.ClientResponse) -> list[GameDetails]:
+    return await parse_stream(response, 'item', GameDetails.from_element)
@@ -14,16 +14,20 @@ Example usage:
 
 import aiohttp
 import datetime
-import xmltodict
+import xml.etree.ElementTree as ET
 import yarl
 
 from typing import TypeVar
 
-BASE_URI = 'https://www.boardgamegeek.com/xmlapi2/'
+from .client import BASE_URI, CLIENT
+from .model import BggModel
+from .parse import child_value, parse_stream
+
 SITE_BASE_URL = 'https://boardgamegeek.com/boardgame/'
+USER_TTL: float = 6 * 3600.0
 
 User_Type =  TypeVar('User_Type', bound='User')
-class User:
+class User(BggModel):
     """Represents a user on BoardGameGeek (BGG) with associated information.
 
     Attributes:
@@ -33,7 +37,8 @@ class User:
         last_name (str): The last name of the user.
         avatar (str): The avatar link of the user.
         year_registered (str): The year when the user registered on BGG.
-        last_login (str): The last login date of the user.
+        last_login (datetime.date | str): The last login date of the user, or
+            an empty string if it is not known.
         state_or_province (str): The state or province of the user's location.
         country (str): The country of the user's location.
         web_address (str): The web address of the user.
@@ -46,6 +51,8 @@ class User:
     
     Methods:
         get_user: Asynchronously retrieves user information from the BGG API.
+        from_element: Builds a User from the user element of a response.
+        to_bytes, from_bytes: Serialize the user, see BggModel.
     
     Properties:
         valid: Determines if the user is valid.
@@ -59,29 +66,67 @@ class User:
         print(user_info.full_name)
         print(user_info.location)
     """
-    def __init__(self, **kwargs) -> None:
-        self.id = kwargs.get('@id', '')
-        self.id = int(self.id) if self.id != '' else 0
-        self.name = kwargs.get('@name', '')
-        self.first_name = kwargs.get('firstname', '').get('@value', '')
-        self.last_name = kwargs.get('lastname', '').get('@value', '')
-        self.avatar = kwargs.get('avatarlink', '').get('@value', '')
-        if self.avatar == 'N/A':
-            self.avatar = ''
-        self.year_registered = kwargs.get('yearregistered', '').get('@value', '')
-        self.last_login = kwargs.get('lastlogin', '').get('@value', '')
-        if self.last_login:
-            self.last_login = datetime.date.fromisoformat(self.last_login)
-        self.state_or_province = kwargs.get('stateorprovince', '').get('@value', '')
-        self.country = kwargs.get('country', '').get('@value', '')
-        self.web_address = kwargs.get('webaddress', '').get('@value', '')
-        self.xbox_account = kwargs.get('xboxaccount', '').get('@value', '')
-        self.wii_account = kwargs.get('wiiaccount', '').get('@value', '')
-        self.psn_addount = kwargs.get('psnaccount', '').get('@value', '')
-        self.battle_net_account = kwargs.get('battlenetaccount', '').get('@value', '')
-        self.steam_account = kwargs.get('steamaccount', '').get('@value', '')
-        self.trade_rating = int(kwargs.get('traderating', '0').get('@value', '0'))
-        # self.market_rating = int(kwargs.get('marketrating', '0').get('@value', '0'))
+    __slots__ = ('id', 'name', 'first_name', 'last_name', 'avatar', 'year_registered',
+                 'last_login', 'state_or_province', 'country', 'web_address', 'xbox_account',
+                 'wii_account', 'psn_addount', 'battle_net_account', 'steam_account',
+                 'trade_rating')
+
+    def __init__(self, id: int = 0, name: str = '', first_name: str = '', last_name: str = '',
+                 avatar: str = '', year_registered: str = '', last_login: datetime.date | str = '',
+                 state_or_province: str = '', country: str = '', web_address: str = '',
+                 xbox_account: str = '', wii_account: str = '', psn_addount: str = '',
+                 battle_net_account: str = '', steam_account: str = '', trade_rating: int = 0) -> None:
+        if isinstance(last_login, str) and last_login:
+            last_login = datetime.date.fromisoformat(last_login)
+        self.id: int = id
+        self.name: str = name
+        self.first_name: str = first_name
+        self.last_name: str = last_name
+        self.avatar: str = avatar
+        self.year_registered: str = year_registered
+        self.last_login: datetime.date | str = last_login
+        self.state_or_province: str = state_or_province
+        self.country: str = country
+        self.web_address: str = web_address
+        self.xbox_account: str = xbox_account
+        self.wii_account: str = wii_account
+        self.psn_addount: str = psn_addount
+        self.battle_net_account: str = battle_net_account
+        self.steam_account: str = steam_account
+        self.trade_rating: int = trade_rating
+
+    @classmethod
+    def from_element(cls, element: ET.Element) -> User_Type:
+        """Builds a User from the ``<user>`` element of a user response.
+
+        Parameters:
+            element (ET.Element): The user element.
+
+        Returns:
+            User: The user, with an id of 0 if BGG does not know them.
+
+        Raises:
+            None
+        """
+        avatar: str = child_value(element, 'avatarlink')
+        return cls(
+            id=int(element.get('id') or 0),
+            name=element.get('name', ''),
+            first_name=child_value(element, 'firstname'),
+            last_name=child_value(element, 'lastname'),
+            avatar='' if avatar == 'N/A' else avatar,
+            year_registered=child_value(element, 'yearregistered'),
+            last_login=child_value(element, 'lastlogin'),
+            state_or_province=child_value(element, 'stateorprovince'),
+            country=child_value(element, 'country'),
+            web_address=child_value(element, 'webaddress'),
+            xbox_account=child_value(element, 'xboxaccount'),
+            wii_account=child_value(element, 'wiiaccount'),
+            psn_addount=child_value(element, 'psnaccount'),
+            battle_net_account=child_value(element, 'battlenetaccount'),
+            steam_account=child_value(element, 'steamaccount'),
+            trade_rating=int(child_value(element, 'traderating') or 0),
+        )
         
     
     @classmethod
@@ -93,8 +138,8 @@ class User:
         parameter in the API request.
 
         If the request is successful (status code 200), the response is parsed
-        as XML. The user information is extracted from the XML response and used
-        to initialize a User object.
+        as it arrives and the user element is used to build a User object. Users are cached for USER_TTL seconds and
+        identical lookups made while one is in flight share its request.
 
         Parameters:
             username (str, optional): The username of the BGG user. Defaults to an empty string.
@@ -103,17 +148,16 @@ class User:
             User: Information on a BGG user represented as User objects.
 
         Raises:
-            None
+            bggif.client.BggUnavailable: If BGG is failing and the user is not cached.
+            aiohttp.ClientError: If BGG cannot be reached and the user is not cached.
         """
-        uri: str = BASE_URI + 'user'
         parameters: dict[str, str] = {'name':username}
-        user: User = None
-        async with aiohttp.ClientSession() as session:
-            async with session.get(uri, params=parameters) as response:
-                if response.status == 200:
-                    raw_xml = await response.text()
-                    user = User(**xmltodict.parse(raw_xml)['user'])
-        return user
+        return await CLIENT.fetch(BASE_URI + 'user', parameters, self._parse_user, USER_TTL)
+
+    @classmethod
+    async def _parse_user(self, response: aiohttp.ClientResponse) -> User_Type | None:
+        users: list[User] = await parse_stream(response, 'user', User.from_element, limit=1)
+        return users[0] if users else None
     
     @property
     def valid(self) -> bool:
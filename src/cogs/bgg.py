@@ -3,20 +3,30 @@
 
 """
 
+import aiohttp
+import asyncio
 import discord
 import logging
 import os
 
-from discord.ext import commands
+from discord.ext import commands, tasks
 
+import bggif.client
+import bggif.collection
 import bggif.hot
 import bggif.search
+import bggif.thing
 import bggif.user
 import utils
 
 logger: logging.Logger = utils.get_dbot_logger()
 
 PREFIX: str = os.getenv('DISCORD_BOT_PREFIX')
+BGG_HOT_REFRESH: float = float(os.getenv('DISCORD_BOT_BGG_HOT_REFRESH', '600'))
+MAX_EMBEDS_PER_MESSAGE: int = 10
+MAX_EMBED_CHARS_PER_MESSAGE: int = 6000
+EMBED_CACHE_ENTRIES: int = 256
+EMBED_CACHE_TTL: float = 24 * 3600.0
 
 ################################################################################
 # Help Documentation
@@ -66,12 +76,108 @@ Example:
 \tReturns information on the BGG user specified.
 
 """
+
+#######################################
+# bgg_collection command help
+#######################################
+BGG_COLLECTION_HELP_BRIEF = 'List the board games a BGG user owns.'
+BGG_COLLECTION_HELP_LONG = f"""
+{BGG_COLLECTION_HELP_BRIEF}
+
+BGG prepares collections on request, so the first lookup of a
+collection can take a minute.
+
+Example:
+\t>{PREFIX}bgg_collection bjmclaughlin
+\tLists the games the BGG user specified owns.
+
+"""
+
+class EmbedCache:
+    """Serialized embeds built from BGG results, reused while the results last.
+
+    Each entry is stored under a request key, such as the search string or
+    the username, together with the bggif objects it was built from. bggif
+    hands back the same objects until its own cache refreshes, so an entry is
+    only used while every one of its sources is still the object the caller
+    has now. Anything newer builds the embeds again.
+
+    Attributes:
+        cache (utils.TTLCache): The entries, ``(sources, payloads)`` tuples.
+
+    Methods:
+        get: Returns the embeds stored for a key and sources.
+        put: Stores the embeds built from sources.
+    """
+    def __init__(self, max_entries: int = EMBED_CACHE_ENTRIES, ttl: float = EMBED_CACHE_TTL) -> None:
+        self.cache: utils.TTLCache = utils.TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def __repr__(self) -> str:
+        return f'<EmbedCache - {self.cache!r}>'
+
+    def get(self, key: tuple, sources: tuple) -> list[discord.Embed] | None:
+        """Returns the embeds stored for a key if they were built from sources.
+
+        Parameters:
+            key (tuple): The request key.
+            sources (tuple): The bggif objects the embeds would be built from.
+
+        Returns:
+            list[discord.Embed]: The embeds, or None if there are none stored
+                or they were built from other objects.
+
+        Raises:
+            None
+        """
+        entry: tuple[tuple, list[dict]] | None = self.cache.get(key)
+        if entry is None or len(entry[0]) != len(sources):
+            return None
+        if not all(stored is source for stored, source in zip(entry[0], sources)):
+            self.cache.invalidate(key)
+            return None
+        return [discord.Embed.from_dict(payload) for payload in entry[1]]
+
+    def put(self, key: tuple, sources: tuple, embeds: list[discord.Embed]) -> None:
+        """Stores the payloads of embeds built from sources.
+
+        Parameters:
+            key (tuple): The request key.
+            sources (tuple): The bggif objects the embeds were built from.
+            embeds (list[discord.Embed]): The embeds.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        self.cache.put(key, (sources, [embed.to_dict() for embed in embeds]))
+
+
+EMBED_CACHE: EmbedCache = EmbedCache()
+
+
 class BggBot(commands.Cog, name='Board Game Geek Functions'):
     """Board Game Geek Commands"""
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         logger.info('BggBot Cog Loaded')
+
+    async def cog_load(self) -> None:
+        """Opens the pooled BGG client session when the cog is loaded."""
+        await bggif.client.CLIENT.start()
+        self.refresh_hot_list.start()
+
+    async def cog_unload(self) -> None:
+        """Closes the BGG client session and its pooled connections."""
+        self.refresh_hot_list.cancel()
+        await bggif.client.CLIENT.close()
+
+    @tasks.loop(seconds=BGG_HOT_REFRESH)
+    async def refresh_hot_list(self) -> None:
+        """Keeps the cached BGG hot list fresh so bgg_hot never waits on BGG."""
+        await bggif.hot.HOT_LIST.refresh()
     
     @commands.command(
             aliases=['bggh'],
@@ -85,7 +191,7 @@ class BggBot(commands.Cog, name='Board Game Geek Functions'):
         This command retrieves the top hot games from BoardGameGeek (BGG) and
         displays them as embedded messages in the Discord channel. The number of
         top games to retrieve can be specified, with a default of 10 if not
-        provided.
+        provided. The embeds are sent up to 10 to a message.
 
         Parameters:
             ctx (commands.Context): The context object representing the invocation context.
@@ -98,13 +204,22 @@ class BggBot(commands.Cog, name='Board Game Geek Functions'):
             None
         """
         logger.info(f'\tTop {number} games requested.')
-        embed_list: list[discord.Embed] = []
         async with ctx.typing():
-            hot_games: list[bggif.hot.HotGame] = await bggif.hot.HotGame.get_hot_games()
-            for game in hot_games[:number]:
-                embed_list.append(hot_embed(ctx, game))
-        for e in embed_list:
-            await ctx.reply(embed=e)
+            hot_games: list[bggif.hot.HotGame] = (await bggif.hot.HOT_LIST.get() or [])[:number]
+            details: dict[int, bggif.thing.GameDetails] = await bggif.thing.get_things(g.id for g in hot_games)
+            sources: tuple = (*hot_games, *(details.get(g.id) for g in hot_games))
+            embed_list: list[discord.Embed] | None = EMBED_CACHE.get(('hot', number), sources)
+            if embed_list is None:
+                embed_list = [hot_embed(ctx, game, details.get(game.id)) for game in hot_games]
+                if embed_list:
+                    EMBED_CACHE.put(('hot', number), sources, embed_list)
+        if not embed_list:
+            await ctx.reply(embed=unavailable_embed(ctx, 'BGG The Hotness'))
+        for i, batch in enumerate(batch_embeds(embed_list)):
+            if i == 0:
+                await ctx.reply(embeds=batch)
+            else:
+                await ctx.send(embeds=batch)
 
     @commands.command(
             brief=BGG_SEARCH_HELP_BRIEF,
@@ -135,8 +250,20 @@ class BggBot(commands.Cog, name='Board Game Geek Functions'):
         logger.info(joined_search)
         items = None
         async with ctx.typing():
-            items: list[bggif.search.SearchItem] = await bggif.search.SearchItem.search(joined_search)
-        await ctx.reply(embed=search_item_embed(ctx, items))
+            try:
+                items: list[bggif.search.SearchItem] = await bggif.search.SearchItem.search(joined_search)
+            except (bggif.client.BggUnavailable, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f'\tBGG search failed: {e!r}')
+                await ctx.reply(embed=unavailable_embed(ctx, 'BGG Search Results'))
+                return
+            details: dict[int, bggif.thing.GameDetails] = await bggif.thing.get_things(i.id for i in items)
+            key: tuple = ('search', joined_search.strip('+').lower())
+            sources: tuple = (*items, *(details.get(i.id) for i in items))
+            search_embeds: list[discord.Embed] | None = EMBED_CACHE.get(key, sources)
+            if search_embeds is None:
+                search_embeds = [search_item_embed(ctx, items, details)]
+                EMBED_CACHE.put(key, sources, search_embeds)
+        await ctx.reply(embed=search_embeds[0])
 
     @commands.command(
             aliases=['bggu'],
@@ -164,22 +291,154 @@ class BggBot(commands.Cog, name='Board Game Geek Functions'):
         """
         logger.info(f'\tSearching for {username}')
         async with ctx.typing():
-            user: bggif.user.User = await bggif.user.User.get_user(username)
-            user_info: discord.Embed = user_embed(ctx, user)
+            try:
+                user: bggif.user.User | None = await bggif.user.User.get_user(username)
+            except (bggif.client.BggUnavailable, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f'\tBGG user lookup failed: {e!r}')
+                user = None
+            if user is None:
+                user_info: discord.Embed = unavailable_embed(ctx, f'BGG User Lookup: {username}')
+            else:
+                key: tuple = ('user', user.id if user.valid else username.strip().lower())
+                cached: list[discord.Embed] | None = EMBED_CACHE.get(key, (user,))
+                if cached is None:
+                    cached = [user_embed(ctx, user)]
+                    EMBED_CACHE.put(key, (user,), cached)
+                user_info = cached[0]
         await ctx.reply(embed=user_info)
 
+    @commands.command(
+            aliases=['bggc'],
+            brief=BGG_COLLECTION_HELP_BRIEF,
+            help=BGG_COLLECTION_HELP_LONG,
+        )
+    async def bgg_collection(self, ctx: commands.Context, *,
+            username: str = commands.parameter(default='', description='BGG Username')) -> None:
+        """Retrieves and displays the board games a BoardGameGeek (BGG) user owns.
+
+        Parameters:
+            ctx (commands.Context): The context object representing the invocation context.
+            username (str, optional): The BoardGameGeek (BGG) username. Defaults to an empty string.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        logger.info(f'\tCollection for {username}')
+        async with ctx.typing():
+            items: list[bggif.collection.CollectionItem] | None = await bggif.collection.get_collection(username)
+            if items is None:
+                await ctx.reply(embed=collection_embed(ctx, username, items))
+                return
+            key: tuple = ('collection', username.strip())
+            cached: list[discord.Embed] | None = EMBED_CACHE.get(key, (items,))
+            if cached is None:
+                cached = [collection_embed(ctx, username, items)]
+                EMBED_CACHE.put(key, (items,), cached)
+        await ctx.reply(embed=cached[0])
+
+def batch_embeds(embeds: list[discord.Embed]) -> list[list[discord.Embed]]:
+    """Splits embeds into groups that fit in one Discord message.
+
+    A message holds at most 10 embeds whose text adds up to at most 6000
+    characters.
+
+    Parameters:
+        embeds (list[discord.Embed]): The embeds, in the order they are sent.
+
+    Returns:
+        list[list[discord.Embed]]: The embeds for each message.
+
+    Raises:
+        None
+    """
+    batches: list[list[discord.Embed]] = []
+    chars: int = 0
+    for embed in embeds:
+        if (not batches or len(batches[-1]) >= MAX_EMBEDS_PER_MESSAGE
+                or chars + len(embed) > MAX_EMBED_CHARS_PER_MESSAGE):
+            batches.append([])
+            chars = 0
+        batches[-1].append(embed)
+        chars += len(embed)
+    return batches
+
+def unavailable_embed(ctx: commands.Context, title: str) -> discord.Embed:
+    """Generates an embedded message saying BoardGameGeek (BGG) could not answer.
+
+    Parameters:
+        ctx (commands.Context): The context object representing the invocation context.
+        title (str): The title of the embed.
+
+    Returns:
+        discord.Embed: An embedded message saying BGG is unavailable.
+
+    Raises:
+        None
+    """
+    unavailable_embed: discord.Embed = discord.Embed(color=discord.Color.red())
+    unavailable_embed.title = f'{title} - BGG Unavailable'
+    unavailable_embed.description = 'BGG is not responding right now, try again later.'
+    return unavailable_embed
+
+def collection_embed(ctx: commands.Context, username: str,
+        items: list[bggif.collection.CollectionItem] | None) -> discord.Embed:
+    """Generates an embedded message listing the games in a BGG user's collection.
+
+    The games are listed by name with a link to their BGG page until the embed
+    description is full, with the total number owned in the footer.
+
+    Parameters:
+        ctx (commands.Context): The context object representing the invocation context.
+        username (str): The BoardGameGeek (BGG) username.
+        items (list[bggif.collection.CollectionItem]): The collection, or None
+            if it could not be retrieved.
+
+    Returns:
+        discord.Embed: An embedded message listing the collection.
+
+    Raises:
+        None
+    """
+    if items is None:
+        collection_embed = discord.Embed(color=discord.Color.red())
+        collection_embed.title = f'BGG Collection: {username} - Not Available'
+        collection_embed.description = 'BGG did not provide the collection, try again later.'
+        return collection_embed
+
+    collection_embed: discord.Embed = discord.Embed(color=discord.Color.light_grey())
+    collection_embed.title = f'BGG Collection: {username}'
+    lines: list[str] = []
+    length: int = 0
+    for item in sorted(items, key=lambda i: i.name.lower()):
+        year_published_string: str = f' ({item.year_published})' if item.year_published else ''
+        line: str = f'[{item.name}]({item.bgg_url}){year_published_string}'
+        if length + len(line) + 1 > 4000:
+            lines.append('...')
+            break
+        lines.append(line)
+        length += len(line) + 1
+    collection_embed.description = '\n'.join(lines) if lines else 'No Games'
+    collection_embed.set_footer(text=f'{len(items)} games owned')
+    return collection_embed
+
 def search_item_embed(ctx: commands.Context,
-        search_items: list[bggif.search.SearchItem]) -> discord.Embed:
+        search_items: list[bggif.search.SearchItem],
+        details: dict[int, bggif.thing.GameDetails] | None = None) -> discord.Embed:
     """Generates an embedded message displaying search results from BoardGameGeek (BGG).
 
     This function takes a list of search items retrieved from a BGG search and
     generates an embedded message displaying the search results. Each search
     item is formatted with its name, publication year (if available), and a
-    hyperlink to its corresponding BGG page.
+    hyperlink to its corresponding BGG page, followed by its rank and rating
+    when its details are known.
 
     Parameters:
         ctx (commands.Context): The context object representing the invocation context.
         search_items (list[bggif.search.SearchItem]): A list of search items retrieved from a BGG search.
+        details (dict[int, bggif.thing.GameDetails], optional): Game details keyed by BGG ID.
 
     Returns:
         discord.Embed: An embedded message displaying the search results.
@@ -192,13 +451,18 @@ def search_item_embed(ctx: commands.Context,
     if search_items:
         for i, item in enumerate(search_items):
             year_published_string: str = f' - ©{item.year_published}' if item.year_published else ''
+            stats_string: str = ''
+            game: bggif.thing.GameDetails | None = (details or {}).get(item.id)
+            if game:
+                stats_string = f' - Rank #{game.rank}' if game.rank else ' - Not Ranked'
+                stats_string += f', ★{game.rating:.2f}' if game.users_rated else ''
             search_embed.add_field(
                 name=f'{i+1:02})',
-                value=f'[{item.name}]({item.bgg_url}){year_published_string}',
+                value=f'[{item.name}]({item.bgg_url}){year_published_string}{stats_string}',
                 inline=False
             )
     else:
-        search_embed.description('No Results')
+        search_embed.description = 'No Results'
     return search_embed
 
 def user_embed(ctx: commands.Context, user:bggif.user.User) -> discord.Embed:
@@ -241,17 +505,20 @@ def user_embed(ctx: commands.Context, user:bggif.user.User) -> discord.Embed:
             user_embed.add_field(name='Location', value=user.location, inline=False)
     return user_embed
 
-def hot_embed(ctx: commands.Context, game: bggif.hot.HotGame) -> discord.Embed:
+def hot_embed(ctx: commands.Context, game: bggif.hot.HotGame,
+        details: bggif.thing.GameDetails | None = None) -> discord.Embed:
     """Generates an embedded message displaying information about a hot BoardGameGeek (BGG) game.
 
     This function takes a hot BGG game object and generates an embedded message
     displaying details about the game. The embedded message includes the game's
     rank, name, publication year, BGG URL, and a footer indicating the source of
-    the information.
+    the information. If the game's details are known its rating, rank, player
+    count and weight are shown too.
 
     Parameters:
         ctx (commands.Context): The context object representing the invocation context.
         game (bggif.hot.HotGame): The hot BGG game object containing information about the game.
+        details (bggif.thing.GameDetails, optional): The details of the game.
 
     Returns:
         discord.Embed: An embedded message displaying information about the hot BGG game.
@@ -262,6 +529,14 @@ def hot_embed(ctx: commands.Context, game: bggif.hot.HotGame) -> discord.Embed:
     hot_embed: discord.Embed = discord.Embed(color=discord.Color.light_grey())
     hot_embed.set_author(name=f'#{game.rank} - {game.name} ({game.year_published})', icon_url=game.thumbnail)
     hot_embed.add_field(name='BGG URL', value=f'[{game.name} on BGG]({game.bgg_url})')
+    if details:
+        if details.users_rated:
+            hot_embed.add_field(name='Rating', value=f'{details.rating:.2f}')
+        hot_embed.add_field(name='BGG Rank', value=details.rank if details.rank else 'Not Ranked')
+        if details.players:
+            hot_embed.add_field(name='Players', value=details.players)
+        if details.weight:
+            hot_embed.add_field(name='Weight', value=f'{details.weight:.2f} / 5')
     hot_embed.set_footer(text="BGG The Hotness Boardgames List")
     return hot_embed
 
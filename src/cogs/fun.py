@@ -1,10 +1,26 @@
 # -*- coding: utf-8 -*-
 """Some functions just for fun for the DBot discord bot.
 
+Fortunes are read straight from the installed fortune databases. Each
+database is a text file of fortunes separated by '%' lines and a ``.dat``
+index written by strfile, which holds the offset of every fortune. Both are
+memory mapped the first time a fortune is asked for, so picking one is a
+lookup in the index and a slice of the text.
+
+The cowsay and cowthink commands are drawn here too, following cowsay 3.03:
+the same options, the same 40 column wrapping and the same .cow files, which
+are parsed once and kept as templates. The default cow is built in for when
+cowsay is not installed.
 """
+import codecs
 import logging
+import mmap
 import os
-import subprocess
+import random
+import re
+import struct
+
+from pathlib import Path
 
 import discord
 from discord.ext import commands
@@ -15,20 +31,41 @@ logger: logging.Logger = utils.get_dbot_logger()
 
 PREFIX: str = os.getenv('DISCORD_BOT_PREFIX')
 
-# Determine the system path to the commands used in this Cog
-COWSAY: str = subprocess.run(['which', 'cowsay'], 
-                        stdout=subprocess.PIPE, 
-                        stderr=subprocess.STDOUT, 
-                        text=True
-                        ).stdout.strip()
-COWTHINK:str  = subprocess.run(['which', 'cowthink'], 
-                         stdout=subprocess.PIPE, 
-                         stderr=subprocess.STDOUT, 
-                         text=True).stdout.strip()
-FORTUNE:str = subprocess.run(['which', 'fortune'], 
-                         stdout=subprocess.PIPE, 
-                         stderr=subprocess.STDOUT,
-                         text=True).stdout.strip()
+MAX_MESSAGE_CHARS: int = 2000
+
+# Where the fortune databases are looked for, the first directory holding any wins
+FORTUNE_DIRS: list[str] = os.getenv(
+    'DISCORD_BOT_FORTUNE_DIR',
+    os.pathsep.join(['/usr/share/games/fortunes', '/usr/share/fortune', '/usr/share/fortunes',
+                     '/usr/local/share/games/fortunes'])
+).split(os.pathsep)
+
+# The strfile header: version, count, longest, shortest, flags and delimiter
+STRFILE_HEADER: struct.Struct = struct.Struct('>5Ic3x')
+STRFILE_OFFSET: struct.Struct = struct.Struct('>I')
+STRFILE_ROTATED: int = 0x4
+
+# Where the .cow files are looked for, in the order cowsay looks
+COWPATH: list[str] = os.getenv(
+    'COWPATH',
+    os.pathsep.join(['/usr/share/cowsay/cows', '/usr/share/cows', '/usr/local/share/cows'])
+).split(os.pathsep)
+COW_OPTIONS: str = 'bde:f:ghlLnNpstT:wW:y'
+COW_WRAP_COLUMNS: int = 40
+COW_LIST_COLUMNS: int = 76
+BLANK_TAIL: re.Pattern = re.compile(r'\s*\Z')
+COW_USAGE: str = """cow{{say,think}} version 3.03, (c) 1999 Tony Monroe
+Usage: {program} [-bdgpstwy] [-h] [-e eyes] [-f cowfile] 
+          [-l] [-n] [-T tongue] [-W wrapcolumn] [message]
+"""
+DEFAULT_COW: str = r"""$the_cow = <<"EOC";
+        $thoughts   ^__^
+         $thoughts  ($eyes)\\_______
+            (__)\\       )\\/\\
+             $tongue ||----w |
+                ||     ||
+EOC
+"""
 
 ################################################################################
 # Help Documentation
@@ -81,13 +118,379 @@ FUN_FORTUNE_HELP_BRIEF: str = 'Display a fortune from the famous UNIX command.'
 FUN_FORTUNE_HELP_LONG: str = f"""
 {FUN_FORTUNE_HELP_BRIEF}
 
+A category, one of the installed fortune databases, can be given to
+pick the fortune from.
+
 Example:
 \t>{PREFIX}fortune
 \t"Hello again, Peabody here..."
 \t-- Mister Peabody
+
+\t>{PREFIX}fortune science
+\tA fortune from the science database.
 """
 
 
+class FortuneFile:
+    """One fortune database, memory mapped along with its strfile index.
+
+    Attributes:
+        category (str): The name of the database, such as 'science'.
+        path (Path): The fortune text file.
+        delimiter (bytes): The line separating fortunes, usually b'%'.
+        rotated (bool): True if the fortunes are stored rot13 encoded.
+
+    Methods:
+        __len__: The number of fortunes.
+        __getitem__: Returns one fortune.
+    """
+    def __init__(self, path: Path) -> None:
+        self.category: str = path.name
+        self.path: Path = path
+        with open(path.with_name(path.name + '.dat'), 'rb') as index_file:
+            self._index: mmap.mmap = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(path, 'rb') as text_file:
+            self._text: mmap.mmap = mmap.mmap(text_file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, count, _, _, flags, delimiter = STRFILE_HEADER.unpack_from(self._index)
+        if len(self._index) < STRFILE_HEADER.size + (count + 1) * STRFILE_OFFSET.size:
+            raise ValueError(f'{path}.dat is too short for {count} fortunes')
+        self._count: int = count
+        self.delimiter: bytes = delimiter
+        self.rotated: bool = bool(flags & STRFILE_ROTATED)
+
+    def __repr__(self) -> str:
+        return f'<FortuneFile - {self.category}, {len(self)} fortunes>'
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, number: int) -> str:
+        if not 0 <= number < self._count:
+            raise IndexError(f'{self.category} has no fortune {number}')
+        position: int = STRFILE_HEADER.size + number * STRFILE_OFFSET.size
+        start: int = STRFILE_OFFSET.unpack_from(self._index, position)[0]
+        end: int = STRFILE_OFFSET.unpack_from(self._index, position + STRFILE_OFFSET.size)[0]
+        data: bytes = self._text[start:end]
+        if data.endswith(b'\n' + self.delimiter + b'\n'):
+            data = data[:-len(self.delimiter) - 1]
+        fortune: str = data.decode('utf-8', errors='replace')
+        return codecs.decode(fortune, 'rot13') if self.rotated else fortune
+
+
+class Fortunes:
+    """The installed fortune databases, loaded once on first use.
+
+    Attributes:
+        directories (list[str]): Where the databases are looked for, the
+            first directory holding any is used.
+
+    Methods:
+        categories: Property that returns the names of the databases.
+        choice: Returns a random fortune.
+    """
+    def __init__(self, directories: list[str]) -> None:
+        self.directories: list[str] = directories
+        self._files: dict[str, FortuneFile] | None = None
+
+    def __repr__(self) -> str:
+        return f'<Fortunes - {len(self.categories)} categories>'
+
+    @property
+    def categories(self) -> list[str]:
+        """The names of the fortune databases.
+
+        Returns:
+            list[str]: The category names, sorted.
+
+        Raises:
+            None
+        """
+        return sorted(self._load())
+
+    def choice(self, category: str = '') -> str | None:
+        """Returns a random fortune.
+
+        Every fortune is equally likely, whichever database it is in.
+
+        Parameters:
+            category (str, optional): Only pick from this database.
+
+        Returns:
+            str: The fortune, or None if there are no fortunes to pick from.
+
+        Raises:
+            KeyError: If there is no database called category.
+        """
+        files: list[FortuneFile] = [self._load()[category]] if category else list(self._load().values())
+        number: int = random.randrange(sum(len(file) for file in files) or 1)
+        for file in files:
+            if number < len(file):
+                return file[number]
+            number -= len(file)
+        return None
+
+    def _load(self) -> dict[str, FortuneFile]:
+        if self._files is not None:
+            return self._files
+        self._files = {}
+        for directory in self.directories:
+            for index in sorted(Path(directory).glob('*.dat')):
+                try:
+                    file: FortuneFile = FortuneFile(index.with_suffix(''))
+                except (OSError, ValueError, struct.error) as e:
+                    logger.warning(f'\tSkipping fortune database {index}: {e!r}')
+                    continue
+                self._files[file.category] = file
+            if self._files:
+                logger.info(f'\tLoaded {len(self._files)} fortune databases from {directory}')
+                break
+        return self._files
+
+
+FORTUNES: Fortunes = Fortunes(FORTUNE_DIRS)
+
+
+class Cows:
+    """The .cow files on COWPATH, each parsed once into a template.
+
+    A .cow file is a short Perl script setting ``$the_cow`` from a here
+    document that uses ``$thoughts``, ``$eyes`` and ``$tongue``. Only that here
+    document is read, with Perl's interpolation and escapes applied, so the
+    files are never run.
+
+    Attributes:
+        directories (list[str]): Where the .cow files are looked for.
+
+    Methods:
+        names: Lists the cows in each directory.
+        template: Returns the template of a cow.
+    """
+    HEREDOC: re.Pattern = re.compile(
+        r'\$the_cow\s*=\s*<<\s*(["\x27]?)(\w+)\1[^\n]*\n(.*?)^\2$', re.S | re.M)
+    INTERPOLATION: re.Pattern = re.compile(r'\\(.)|\$\{(\w+)\}|\$(\w+)|@[A-Za-z_]\w*', re.S)
+    ESCAPES: dict[str, str] = {'n': '\n', 't': '\t'}
+
+    def __init__(self, directories: list[str]) -> None:
+        self.directories: list[str] = directories
+        self._templates: dict[str, str | None] = {}
+
+    def __repr__(self) -> str:
+        return f'<Cows - {len(self._templates)} templates loaded>'
+
+    def names(self) -> dict[str, list[str]]:
+        """Lists the cows in each directory.
+
+        Returns:
+            dict[str, list[str]]: The sorted cow names, keyed by the
+                directories that exist.
+
+        Raises:
+            None
+        """
+        return {directory: sorted(path.stem for path in Path(directory).glob('*.cow'))
+                for directory in self.directories if Path(directory).is_dir()}
+
+    def template(self, name: str) -> str | None:
+        """Returns the template of a cow, ready for :meth:`str.format`.
+
+        The cow is looked up as cowsay does, as ``name`` and then
+        ``name.cow`` in each directory, except that paths are not accepted.
+
+        Parameters:
+            name (str): The cow, such as 'default' or 'tux'.
+
+        Returns:
+            str: A template with ``{thoughts}``, ``{eyes}`` and ``{tongue}``
+                fields, or None if there is no such cow.
+
+        Raises:
+            None
+        """
+        if name not in self._templates:
+            self._templates[name] = self._load(name)
+        return self._templates[name]
+
+    def _load(self, name: str) -> str | None:
+        if not name or '/' in name or name.startswith('.'):
+            return None
+        for directory in self.directories:
+            for path in (Path(directory) / name, Path(directory) / f'{name}.cow'):
+                if path.is_file():
+                    try:
+                        return self.parse(path.read_text(encoding='utf-8', errors='replace'))
+                    except (OSError, ValueError) as e:
+                        logger.warning(f'\tSkipping cow {path}: {e!r}')
+                        return None
+        return self.parse(DEFAULT_COW) if name in ('default', 'default.cow') else None
+
+    @classmethod
+    def parse(cls, source: str) -> str:
+        """Turns the Perl source of a .cow file into a template.
+
+        Parameters:
+            source (str): The contents of the .cow file.
+
+        Returns:
+            str: The template, see :meth:`template`.
+
+        Raises:
+            ValueError: If the file does not set ``$the_cow`` from a here
+                document.
+        """
+        heredoc: re.Match | None = cls.HEREDOC.search(source)
+        if heredoc is None:
+            raise ValueError('No $the_cow here document')
+        quote, _, body = heredoc.groups()
+        if quote == "'":
+            return body.replace('{', '{{').replace('}', '}}')
+        pieces: list[str] = []
+        position: int = 0
+        for match in cls.INTERPOLATION.finditer(body):
+            pieces.append(body[position:match.start()].replace('{', '{{').replace('}', '}}'))
+            escaped, braced, variable = match.groups()
+            if escaped is not None:
+                pieces.append(cls.ESCAPES.get(escaped, escaped).replace('{', '{{').replace('}', '}}'))
+            elif (braced or variable) in ('thoughts', 'eyes', 'tongue'):
+                pieces.append('{' + (braced or variable) + '}')
+            position = match.end()
+        pieces.append(body[position:].replace('{', '{{').replace('}', '}}'))
+        return ''.join(pieces)
+
+
+COWS: Cows = Cows(COWPATH)
+
+
+def render_cow(args: list[str], think: bool = False) -> str:
+    """Draws a cow saying or thinking a message, as cowsay and cowthink do.
+
+    The arguments are the command line cowsay would be given, options first
+    and then the words of the message. The output, warnings and errors
+    included, is what cowsay 3.03 prints for them.
+
+    Parameters:
+        args (list[str]): The options and words of the message.
+        think (bool, optional): Draw a thought balloon as cowthink does.
+
+    Returns:
+        str: The drawing.
+
+    Raises:
+        None
+    """
+    program: str = 'cowthink' if think else 'cowsay'
+    options, message, output = _getopts(args, COW_OPTIONS)
+    if 'h' in options or ('n' in options and message):
+        return output + COW_USAGE.format(program=program)
+    if 'l' in options:
+        for directory, names in COWS.names().items():
+            output += f'Cow files in {directory}:\n' + _wrap(' '.join(names), COW_LIST_COLUMNS) + '\n'
+        return output
+
+    cow: str = options.get('f', 'default.cow')
+    template: str | None = COWS.template(cow)
+    if template is None:
+        return output + f'{program}: Could not find {cow} cowfile!\n'
+
+    eyes: str = options.get('e', 'oo')[:2]
+    tongue: str = options.get('T', '  ')[:2]
+    for flag, face in (('b', '=='), ('d', 'xx'), ('g', '$$'), ('p', '@@'), ('s', '**'),
+                       ('t', '--'), ('w', 'OO'), ('y', '..')):
+        if flag in options:
+            eyes = face
+            if flag in 'ds':
+                tongue = 'U '
+
+    columns: int = _perl_int(options.get('W', str(COW_WRAP_COLUMNS)))
+    lines: list[str] = _fill(' '.join(message), max(columns, 2)).split('\n')
+    while lines and not lines[-1]:
+        lines.pop()
+    lines = lines or ['']
+    return output + _balloon(lines, think) + template.format(
+        thoughts='o' if think else '\\', eyes=eyes, tongue=tongue)
+
+
+def _getopts(args: list[str], spec: str) -> tuple[dict[str, str], list[str], str]:
+    # Getopt::Std: clustered flags, '--' ends the options and unknown ones warn
+    options: dict[str, str] = {}
+    args = list(args)
+    warnings: str = ''
+    while args and len(args[0]) > 1 and args[0].startswith('-'):
+        first, rest = args[0][1], args[0][2:]
+        if args[0] == '--':
+            args.pop(0)
+            break
+        position: int = spec.find(first) if first != ':' else -1
+        if position >= 0 and spec[position + 1:position + 2] == ':':
+            args.pop(0)
+            if rest == '':
+                rest = args.pop(0) if args else ''
+            options[first] = rest
+        else:
+            if position >= 0:
+                options[first] = '1'
+            else:
+                warnings += f'Unknown option: {first}\n'
+            if rest == '':
+                args.pop(0)
+            else:
+                args[0] = '-' + rest
+    return options, args, warnings
+
+
+def _perl_int(value: str) -> int:
+    number: re.Match | None = re.match(r'\s*([+-]?\d+)', value)
+    return int(number.group(1)) if number else 0
+
+
+def _fill(text: str, columns: int) -> str:
+    # Text::Wrap::fill: paragraphs split on a newline and whitespace, with
+    # their whitespace squeezed, wrapped and joined by a blank line
+    paragraphs: list[str] = re.split(r'\n\s+', text)
+    while paragraphs and not paragraphs[-1]:
+        paragraphs.pop()
+    return '\n\n'.join(_wrap(re.sub(r'\s+', ' ', paragraph), columns) for paragraph in paragraphs)
+
+
+def _wrap(text: str, columns: int) -> str:
+    # Text::Wrap::wrap: lines of at most columns - 1 characters broken at
+    # whitespace, longer words broken where the line is full
+    width: int = max(columns - 1, 1)
+    line: re.Pattern = re.compile(rf'(.{{0,{width}}})(\s|\Z)')
+    wrapped: str = ''
+    separator: str = ''
+    remainder: str = ''
+    position: int = 0
+    while not BLANK_TAIL.match(text, position):
+        match: re.Match | None = line.match(text, position)
+        if match:
+            wrapped += separator + match.group(1)
+            remainder = match.group(2)
+            position = match.end()
+        else:
+            wrapped += separator + text[position:position + width]
+            remainder = '\n'
+            position += width
+        separator = '\n'
+    return wrapped + remainder
+
+
+def _balloon(lines: list[str], think: bool) -> str:
+    width: int = max(len(line) for line in lines)
+    if think:
+        border: str = '()()()'
+    elif len(lines) < 2:
+        border = '<>'
+    else:
+        border = '/\\\\/||'
+    balloon: list[str] = [' ' + '_' * (width + 2) + ' \n',
+                          f'{border[0]} {lines[0]:<{width}} {border[1]}\n']
+    if len(lines) > 1:
+        balloon += [f'{border[4]} {line:<{width}} {border[5]}\n' for line in lines[1:-1]]
+        balloon.append(f'{border[2]} {lines[-1]:<{width}} {border[3]}\n')
+    balloon.append(' ' + '-' * (width + 2) + ' \n')
+    return ''.join(balloon)
+
+
 class FunBot(commands.Cog, name='Some additional "fun"ctionality.'):
     """Some fun commands."""
 
@@ -102,16 +505,20 @@ class FunBot(commands.Cog, name='Some additional "fun"ctionality.'):
             brief=FUN_FORTUNE_HELP_BRIEF,
             help=FUN_FORTUNE_HELP_LONG,
     )
-    async def fortune(self, ctx: commands.Context):
+    async def fortune(self, ctx: commands.Context, *,
+        category: str = commands.parameter(default='', description='Fortune database to pick from.')):
         """Displays a fortune cookie message.
 
-        This command generates a random fortune message using the 'fortune'
-        command-line tool. The generated message is then sent as an embedded
-        message to the Discord channel where the command was invoked.
+        This command picks a random fortune message from the installed fortune
+        databases, the same ones the 'fortune' command-line tool reads. The
+        message is then sent as an embedded message to the Discord channel
+        where the command was invoked.
 
         Parameters:
             ctx (commands.Context): The context object representing the
                                     invocation context.
+            category (str, optional): The fortune database to pick from.
+                                      Defaults to all of them.
 
         Returns:
             None
@@ -119,14 +526,17 @@ class FunBot(commands.Cog, name='Some additional "fun"ctionality.'):
         Raises:
             None
         """
-        async with ctx.typing():
-            data:str = subprocess.run([FORTUNE], 
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.STDOUT,
-                                    text=True).stdout.strip()
-            em: discord.Embed = discord.Embed(color=discord.Color.light_grey())
-            em.title = f'Fortune'
-            em.description = data
+        try:
+            data: str | None = FORTUNES.choice(category.strip().lower())
+        except KeyError:
+            await ctx.send(f'No fortunes about {category}, try one of: {", ".join(FORTUNES.categories)}')
+            return
+        if data is None:
+            await ctx.send('No fortunes right now, try again later.')
+            return
+        em: discord.Embed = discord.Embed(color=discord.Color.light_grey())
+        em.title = f'Fortune'
+        em.description = data.strip()
         await ctx.send(embed=em)
 
     ############################################################################
@@ -139,11 +549,12 @@ class FunBot(commands.Cog, name='Some additional "fun"ctionality.'):
     )
     async def cowsay(self, ctx: commands.Context, *, 
         message: str = commands.parameter(default='Moo', description='Message for the cow to say.')):
-        """Generates a cow ASCII art with a custom message using the 'cowsay' command-line tool.
+        """Generates a cow ASCII art with a custom message, as the 'cowsay' command-line tool does.
 
         This command generates a cow ASCII art with a custom message provided by
         the user. If no message is provided, the default message "Moo" is used.
-        The generated ASCII art is then sent as a code block in the Discord
+        The message may start with cowsay options, such as -f to pick another
+        cow. The generated ASCII art is then sent as a code block in the Discord
         channel where the command was invoked.
 
         Parameters:
@@ -159,13 +570,8 @@ class FunBot(commands.Cog, name='Some additional "fun"ctionality.'):
             None
         """
         logger.info(f'\t{message}')
-        async with ctx.typing():
-            args: list[str] = message.split(' ')
-            data: str = subprocess.run([COWSAY] + args, 
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.STDOUT,
-                                text=True).stdout
-        await ctx.send(f'```{data}```')
+        data: str = render_cow(message.split(' '), think=False)
+        await ctx.send(code_block(data))
 
     ############################################################################
     # cowthink command
@@ -177,11 +583,12 @@ class FunBot(commands.Cog, name='Some additional "fun"ctionality.'):
     )
     async def cowthink(self, ctx: commands.Context, *,
         message:str = commands.parameter(default='Moo', description='Message for the cow to think.')):
-        """Generates a cow ASCII art with a custom message using the 'cowthink' command-line tool.
+        """Generates a cow ASCII art with a custom message, as the 'cowthink' command-line tool does.
 
         This command generates a cow ASCII art with a custom message provided by
         the user. If no message is provided, the default message "Moo" is used.
-        The generated ASCII art is then sent as a code block in the Discord
+        The message may start with cowthink options, such as -f to pick another
+        cow. The generated ASCII art is then sent as a code block in the Discord
         channel where the command was invoked.
 
         Parameters:
@@ -197,13 +604,23 @@ class FunBot(commands.Cog, name='Some additional "fun"ctionality.'):
             None
         """
         logger.info(f'\t{message}')
-        async with ctx.typing():
-            args: list[str] = message.split(' ')
-            data: str = subprocess.run([COWTHINK] + args,
-                   stdout=subprocess.PIPE,
-                   stderr=subprocess.STDOUT,
-                   text=True).stdout
-        await ctx.send(f'```{data}```')
+        data: str = render_cow(message.split(' '), think=True)
+        await ctx.send(code_block(data))
+
+
+def code_block(text: str) -> str:
+    """Wraps text in a code block, cut short to fit in one Discord message.
+
+    Parameters:
+        text (str): The text.
+
+    Returns:
+        str: The code block.
+
+    Raises:
+        None
+    """
+    return f'```{text[:MAX_MESSAGE_CHARS - 6]}```'
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -3,37 +3,109 @@
 
 """
 import argparse
-import datetime
+import asyncio
+import concurrent.futures
+import functools
+import io
 import logging
+import math
 import os
 import pathlib
-import random
 import re
-import statistics
+
+from typing import Hashable, Iterable, NamedTuple
 
 import discord
+import numpy as np
 from discord.ext import commands
 
 import utils
 
 ###############################################################################
 # Configure the MPLCONFIGDIR environmental variable to give matplotlib a place
-# to work in the user access area in the Docker container.
+# to work in the user access area in the Docker container. matplotlib itself is
+# only imported when the first plot is rendered, see Distribution.render_png.
 ###############################################################################
 mpl_config = pathlib.Path.cwd() / 'mpl_config'
 mpl_config.mkdir(parents=True, exist_ok=True)
 os.environ['MPLCONFIGDIR'] = str(mpl_config)
 ###############################################################################
 
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mtick
-
-mpl.use('Agg')
 logger: logging.Logger = utils.get_dbot_logger()
 
 PREFIX: str = os.getenv('DISCORD_BOT_PREFIX')
 
+SIM_WORKERS: int = int(os.getenv('DISCORD_BOT_SIM_WORKERS', '2'))
+"""int : Number of worker processes that run ``roll_sim`` jobs."""
+
+SIM_QUEUE_DEPTH: int = int(os.getenv('DISCORD_BOT_SIM_QUEUE_DEPTH', '8'))
+"""int : Number of ``roll_sim`` jobs allowed to wait for a free worker."""
+
+SIM_TIMEOUT: float = float(os.getenv('DISCORD_BOT_SIM_TIMEOUT', '30'))
+"""float : Seconds a ``roll_sim`` job may take before the request gives up."""
+
+SIM_CACHE_TTL: float = float(os.getenv('DISCORD_BOT_SIM_CACHE_TTL', '3600'))
+"""float : Seconds a rendered ``roll_sim`` result is reused for."""
+
+SIM_CACHE_DIR: str | None = os.getenv('DISCORD_BOT_SIM_CACHE_DIR')
+"""str | None : Directory that keeps rendered ``roll_sim`` results across restarts."""
+
+SIM_CACHE: utils.TTLCache = utils.TTLCache(
+    max_entries=256,
+    ttl=SIM_CACHE_TTL,
+    max_bytes=32 * 1024 * 1024,
+    directory=SIM_CACHE_DIR,
+)
+"""utils.TTLCache : Rendered ``roll_sim`` histograms and their distributions."""
+
+SIM_MAX_TRIALS: int = 1_000_000
+"""int : The maximum number of trials ``roll_sim`` will run."""
+
+SIM_BATCH_DRAWS: int = 2_000_000
+"""int : Approximate number of dice drawn per vectorized simulation batch."""
+
+PLOT_MAX_BINS: int = 300
+"""int : Most bars in a ``roll_sim`` plot, wider ranges of results are binned."""
+
+EXPLODE_DEPTH: int = 100
+"""int : Maximum number of extra dice a single exploding die can add."""
+
+ROLL_PLAN_CACHE_SIZE: int = 256
+"""int : Number of compiled roll plans kept in the LRU cache."""
+
+EXACT_TAIL_PROBABILITY: float = 1e-12
+"""float : Explosion chains less likely than this are truncated in exact distributions."""
+
+EXACT_MAX_SUPPORT: int = 20_000
+"""int : Largest range of totals an exact dice specification distribution may span."""
+
+EXACT_MAX_KEEP_STEPS: int = 20_000
+"""int : Largest ``sides * dice**2`` for an exact keep/drop distribution."""
+
+EXACT_MAX_OUTCOMES: int = 2_000_000
+"""int : Largest joint outcome space enumerated to combine exact distributions."""
+
+EXPR_MAX_TERMS: int = 60
+"""int : Most dice specifications evaluated over arrays at once, numexpr takes at most 63 inputs."""
+
+SIM_PERCENTILES: tuple[int, ...] = (5, 25, 50, 75, 95)
+"""tuple[int, ...] : Percentiles reported by ``roll_sim``."""
+
+ROLL_MAX_DICE: int = int(os.getenv('DISCORD_BOT_ROLL_MAX_DICE', '1000'))
+"""int : Most dice, including expected explosions, a single roll may use."""
+
+ROLL_MAX_SIDES: int = int(os.getenv('DISCORD_BOT_ROLL_MAX_SIDES', '1000000'))
+"""int : Most sides a die may have."""
+
+ROLL_MAX_OUTPUT: int = 1900
+"""int : Longest roll result shown die by die, longer results only show totals."""
+
+SIM_MAX_DRAWS: int = int(os.getenv('DISCORD_BOT_SIM_MAX_DRAWS', '100000000'))
+"""int : Most dice a single ``roll_sim`` may draw, the trials are reduced to fit."""
+
+DICE_RNG_BACKEND: str = os.getenv('DISCORD_BOT_DICE_RNG', 'PCG64')
+"""str : Name of the numpy.random bit generator dice are rolled with."""
+
 ################################################################################
 # Help Documentation
 ################################################################################
@@ -62,6 +134,36 @@ Example:
 \t>{PREFIX}roll_sim 1d20
 \tDisplay a plot of the dice statistics.
 
+\t>{PREFIX}roll_sim -n 100000 4d6k3
+\tSimulate the roll 100,000 times.
+
+\t>{PREFIX}roll_sim --exact 4d6k3
+\tCalculate the exact distribution instead of simulating, when possible.
+
+"""
+
+#######################################
+# roll_seed command help
+#######################################
+ROLL_SEED_HELP_BRIEF: str = 'Seed your dice for reproducible rolls.'
+ROLL_SEED_HELP_LONG: str = f"""
+{ROLL_SEED_HELP_BRIEF}
+
+Your rolls and simulations use a stream seeded with the
+number given until the seed is cleared. With --channel the
+seed applies to everyone in the channel who has not set
+their own, which needs the Manage Channels permission.
+Results from seeded dice are marked "(seeded)".
+
+Example:
+\t>{PREFIX}roll_seed 42
+\tSeed your rolls.
+
+\t>{PREFIX}roll_seed --channel 42
+\tSeed the rolls in this channel.
+
+\t>{PREFIX}roll_seed
+\tGo back to unseeded rolls.
 """
 
 class RollDice(commands.Cog, name='Dice Rolling'):
@@ -69,8 +171,53 @@ class RollDice(commands.Cog, name='Dice Rolling'):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.sim_pool: concurrent.futures.ProcessPoolExecutor = new_sim_pool()
+        self.sim_jobs: int = 0
         logger.info('RollDice Cog Loaded')
 
+    async def cog_unload(self) -> None:
+        """Stop the simulation worker processes when the cog is unloaded."""
+        self.sim_pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run_sim_job(self, fn, *args):
+        """Run a CPU bound function in the simulation process pool.
+
+        The job counts against the queue depth until the worker process has
+        actually finished with it, even if the request times out first, so a
+        flood of slow jobs cannot build an unbounded backlog.
+
+        Parameters:
+            fn (Callable): A picklable, module level function to run.
+            *args: The arguments for ``fn``.
+
+        Returns:
+            Any: The return value of ``fn``.
+
+        Raises:
+            SimulatorBusy: If the pool and its queue are full.
+            asyncio.TimeoutError: If the job takes longer than SIM_TIMEOUT.
+        """
+        if self.sim_jobs >= SIM_WORKERS + SIM_QUEUE_DEPTH:
+            raise SimulatorBusy(f'{self.sim_jobs} roll_sim jobs already pending')
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        def finished(_: concurrent.futures.Future) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._sim_job_finished)
+
+        try:
+            job: concurrent.futures.Future = self.sim_pool.submit(fn, *args)
+        except concurrent.futures.BrokenExecutor:
+            logger.warning('Simulation pool broken, starting a new one.')
+            self.sim_pool = new_sim_pool()
+            job = self.sim_pool.submit(fn, *args)
+        self.sim_jobs += 1
+        job.add_done_callback(finished)
+        return await asyncio.wait_for(asyncio.wrap_future(job), SIM_TIMEOUT)
+
+    def _sim_job_finished(self) -> None:
+        self.sim_jobs -= 1
+
     ############################################################################
     # roll command
     ############################################################################
@@ -108,15 +255,21 @@ class RollDice(commands.Cog, name='Dice Rolling'):
             try:
                 results: str = ''
                 total: int = 0
-                results, total = Die.dice_roller(dice_string)
+                results, total = Die.dice_roller(dice_string, DICE_RNG.stream(*rng_keys(ctx)))
+                seeded: str = ' (seeded)' if DICE_RNG.is_seeded(*rng_keys(ctx)) else ''
             except SyntaxError as se:
                 roll_exception: SyntaxError = se
                 logger.exception(se)
-        if roll_exception:
+            except DiceLimitExceeded as dle:
+                roll_exception: DiceLimitExceeded = dle
+                logger.warning(f'\t{dle}')
+        if isinstance(roll_exception, DiceLimitExceeded):
+            await ctx.reply(f'Dice Roll Too Large: {roll_exception}')
+        elif roll_exception:
             await ctx.reply(f'Error In Dice Roll')
         else:
-            await ctx.reply(f'{results} = {total}')
-            logger.info(f'\tResult: {results} = {total}')
+            await ctx.reply(f'{results} = {total}{seeded}')
+            logger.info(f'\tResult: {results} = {total}{seeded}')
 
     ############################################################################
     # roll_sim command
@@ -132,10 +285,17 @@ class RollDice(commands.Cog, name='Dice Rolling'):
         This command simulates multiple dice rolls based on the provided dice
         roll expression. If no expression is provided, it defaults to simulating
         a single 20-sided die (1d20). The simulation is run a default of 10,000
-        times, or the specified number of times if provided.
+        times, or the specified number of times (up to 1,000,000) if provided.
+        With ``--exact`` the distribution is calculated exactly instead, falling
+        back to the simulation when that is not tractable. The simulation runs
+        in a worker process and uses the seeded stream set with ``roll_seed``,
+        if there is one.
         
         The results of the simulation are displayed as a histogram image in the
-        Discord channel where the command was invoked.
+        Discord channel where the command was invoked, along with the mean,
+        standard deviation and percentiles. Unseeded results are cached, so a
+        repeat of a recent request is answered without simulating or plotting
+        again.
 
         Parameters:
             ctx (commands.Context): The context object representing the invocation context.
@@ -151,30 +311,519 @@ class RollDice(commands.Cog, name='Dice Rolling'):
         async with ctx.typing():
             parser: argparse.ArgumentParser = argparse.ArgumentParser()
             parser.add_argument('-n', '--n_times', default=10000, type=int)
+            parser.add_argument('-e', '--exact', action='store_true')
             parser.add_argument('roll_spec', nargs='*')
             args: argparse.Namespace = parser.parse_args(dice_string.split())
             args.roll_spec = ' '.join(args.roll_spec)
 
             logger.info(f'\t{dice_string}')
-            if args.n_times > 10000:
-                args.n_times = 10000
             try:
-                fname: tuple[float, float, str] = Die.dice_sim(args.roll_spec, args.n_times)
+                plan: RollPlan = RollPlan.from_string(args.roll_spec)
+                plan.check()
+                args.n_times = max(1, min(args.n_times, SIM_MAX_TRIALS, SIM_MAX_DRAWS // max(1, plan.cost.dice)))
+                png: bytes = b''
+                dist: Distribution = None
+                seed: int | None = None
+                if DICE_RNG.is_seeded(*rng_keys(ctx)):
+                    seed = int(DICE_RNG.stream(*rng_keys(ctx)).integers(2**63))
+                # Seeded requests draw a new seed every time, so they are
+                # never cached and cannot push other results out.
+                cache_key: tuple[str, int, bool] = \
+                    (RollPlan.normalize(args.roll_spec), args.n_times, args.exact)
+                cached: tuple[bytes, Distribution] | None = \
+                    SIM_CACHE.get(cache_key) if seed is None else None
+                if cached:
+                    png, dist = cached
+                else:
+                    png, dist = await self.run_sim_job(
+                        Die.dice_sim, args.roll_spec, args.n_times, args.exact, seed)
+                    if seed is None:
+                        size: int = len(png) + dist.values.nbytes + dist.probs.nbytes
+                        SIM_CACHE.put(cache_key, (png, dist), size=size)
             except SyntaxError as se:
                 roll_exception: SyntaxError = se
                 logger.exception(se)
+            except DiceLimitExceeded as dle:
+                roll_exception: DiceLimitExceeded = dle
+                logger.warning(f'\t{dle}')
+            except SimulatorBusy as sb:
+                roll_exception: SimulatorBusy = sb
+                logger.warning(sb)
+            except asyncio.TimeoutError as te:
+                roll_exception: asyncio.TimeoutError = te
+                logger.warning(f'\troll_sim timed out after {SIM_TIMEOUT}s')
             
-        if roll_exception:
+        if isinstance(roll_exception, DiceLimitExceeded):
+            await ctx.reply(f'Dice Roll Too Large: {roll_exception}')
+        elif isinstance(roll_exception, SimulatorBusy):
+            await ctx.reply(f'The dice simulator is busy, please try again shortly.')
+        elif isinstance(roll_exception, asyncio.TimeoutError):
+            await ctx.reply(f'Dice Roll Simulation Took Too Long')
+        elif roll_exception:
             await ctx.reply(f'Error In Dice Roll')
         else:
-            p_file: discord.File = discord.File(fname, filename='image.png')
+            p_file: discord.File = discord.File(io.BytesIO(png), filename='image.png')
             embed: discord.Embed = discord.Embed(
                 title='Dice Roll Simulator',
                 color=0x00ff00
             )
+            embed.add_field(name='Mean', value=f'{dist.mean:0.2f}')
+            embed.add_field(name='Std Dev', value=f'{dist.stdev:0.2f}')
+            embed.add_field(
+                name='Percentiles',
+                value=' | '.join(f'{q}%: {dist.percentile(q)}' for q in SIM_PERCENTILES),
+                inline=False
+            )
+            footer: list[str] = []
+            if args.exact and dist.trials:
+                footer.append(f'Exact distribution not tractable, simulated {dist.trials:,} rolls.')
+            if seed is not None and dist.trials:
+                footer.append('Simulated with seeded dice.')
+            if footer:
+                embed.set_footer(text=' '.join(footer))
             embed.set_image(url='attachment://image.png')
             await ctx.reply(embed=embed, file=p_file)
-            os.remove(fname)
+
+    ############################################################################
+    # roll_seed command
+    ############################################################################
+    @commands.command(
+            brief=ROLL_SEED_HELP_BRIEF,
+            help=ROLL_SEED_HELP_LONG,
+    )
+    async def roll_seed(self, ctx: commands.Context, *,
+        seed_string: str = commands.parameter(default='', description='Seed, or nothing to clear it')) -> None:
+        """Sets or clears a seeded random stream for the user or channel.
+
+        While a seed is set the user's (or channel's) rolls and simulations are
+        drawn from a stream seeded with it, so the same sequence of commands
+        produces the same results. Whoever knows a seed can predict the rolls,
+        so only members who may manage the channel can set or clear its seed.
+
+        Parameters:
+            ctx (commands.Context): The context object representing the invocation context.
+            seed_string (str, optional): The seed, optionally preceded by
+                                         ``--channel``. Clears the seed if
+                                         no seed is given.
+
+        Returns:
+            None
+
+        Raises:
+            None
+        """
+        parser: argparse.ArgumentParser = argparse.ArgumentParser()
+        parser.add_argument('-c', '--channel', action='store_true')
+        parser.add_argument('seed', nargs='?', default=None, type=int)
+        try:
+            args: argparse.Namespace = parser.parse_args(seed_string.split())
+        except SystemExit:
+            await ctx.reply(f'Invalid Seed')
+            return
+
+        if args.channel and ctx.guild is not None and \
+                not ctx.channel.permissions_for(ctx.author).manage_channels:
+            logger.warning(f'\tChannel seed refused for {ctx.author} on channel {ctx.channel}')
+            await ctx.reply('Seeding the dice for this channel needs the Manage Channels permission.')
+            return
+
+        user_key, channel_key = rng_keys(ctx)
+        key: tuple[str, int] = channel_key if args.channel else user_key
+        target: str = 'this channel' if args.channel else ctx.author.display_name
+        logger.info(f'\tSeed for {key}: {args.seed}')
+        DICE_RNG.seed(key, args.seed)
+        if args.seed is None:
+            await ctx.reply(f'Dice for {target} are no longer seeded.')
+        else:
+            await ctx.reply(f'Dice for {target} are seeded with {args.seed}.')
+
+
+def rng_keys(ctx: commands.Context) -> tuple[tuple[str, int], tuple[str, int]]:
+    """The keys a command's seeded random stream is looked up under.
+
+    Parameters
+    ----------
+    ctx (commands.Context): The context object representing the invocation context.
+
+    Returns
+    -------
+    tuple[tuple[str, int], tuple[str, int]]: The user's key, then the channel's.
+
+    """
+    return ('user', ctx.author.id), ('channel', ctx.channel.id)
+
+
+class SimulatorBusy(Exception):
+    """Raised when the ``roll_sim`` process pool has no room for another job."""
+
+
+class DiceLimitExceeded(ValueError):
+    """Raised when a dice roll would use more resources than allowed."""
+
+
+class RollCost(NamedTuple):
+    """The estimated cost of rolling a :class:`RollPlan` once.
+
+    Attributes
+    ----------
+    dice (int): Number of dice drawn before any explode.
+    sides (int): Number of sides on the largest die.
+    expected_dice (float): Number of dice including the expected explosions.
+    output_chars (int): Estimated length of the displayed result.
+
+    """
+    dice: int
+    sides: int
+    expected_dice: float
+    output_chars: int
+
+
+def new_sim_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Create the process pool that runs ``roll_sim`` jobs.
+
+    Returns
+    -------
+    concurrent.futures.ProcessPoolExecutor: A pool of SIM_WORKERS processes.
+
+    """
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=SIM_WORKERS,
+        initializer=_init_sim_worker,
+    )
+
+
+def _init_sim_worker() -> None:
+    """Give each worker process its own random stream.
+
+    Forked workers inherit a copy of the parent's generator state, which would
+    make every worker produce the same rolls.
+    """
+    DICE_RNG.reseed()
+
+
+class RngStreams:
+    """The random number streams dice are rolled with.
+
+    Rolls draw from a shared default stream unless a seeded stream has been
+    set for one of the keys they are rolled under, such as the user or the
+    channel, which makes their rolls and simulations reproducible. Every
+    stream is a :class:`numpy.random.Generator`, which draws many dice in one
+    call, over a configurable bit generator.
+
+    Parameters
+    ----------
+    bit_generator (str): Name of a numpy.random bit generator, e.g. ``PCG64``,
+                         ``SFC64``, ``Philox`` or ``MT19937``.
+
+    """
+
+    def __init__(self, bit_generator: str = 'PCG64') -> None:
+        self.bit_generator: type = getattr(np.random, bit_generator, None)
+        if not (isinstance(self.bit_generator, type) and
+                issubclass(self.bit_generator, np.random.BitGenerator)):
+            raise ValueError(f'{bit_generator} is not a numpy.random bit generator')
+        self.default: np.random.Generator = self.new_stream()
+        self._seeded: dict[Hashable, np.random.Generator] = {}
+
+    def __repr__(self) -> str:
+        return f'<RngStreams - {self.bit_generator.__name__}, {len(self._seeded)} seeded>'
+
+    def new_stream(self, seed: int | None = None) -> np.random.Generator:
+        """Create a stream.
+
+        Parameters
+        ----------
+        seed (int | None): The seed, or None for fresh OS entropy.
+
+        Returns
+        -------
+        np.random.Generator: The new stream.
+
+        """
+        return np.random.Generator(self.bit_generator(seed))
+
+    def reseed(self) -> None:
+        """Replace the default stream with one seeded from fresh OS entropy."""
+        self.default = self.new_stream()
+
+    def seed(self, key: Hashable, seed: int | None) -> None:
+        """Set or remove the seeded stream for a key.
+
+        Parameters
+        ----------
+        key (Hashable): What the stream is for, e.g. ``('user', user_id)``.
+        seed (int | None): The seed, or None to go back to the default stream.
+
+        """
+        if seed is None:
+            self._seeded.pop(key, None)
+        else:
+            self._seeded[key] = self.new_stream(seed)
+
+    def is_seeded(self, *keys: Hashable) -> bool:
+        """Identifies if any of the keys has a seeded stream."""
+        return any(k in self._seeded for k in keys)
+
+    def stream(self, *keys: Hashable) -> np.random.Generator:
+        """Get the stream to roll with.
+
+        Parameters
+        ----------
+        *keys (Hashable): Keys to look for a seeded stream under, in order of
+                          preference.
+
+        Returns
+        -------
+        np.random.Generator: The first seeded stream found, or the default
+                             stream.
+
+        """
+        for k in keys:
+            if k in self._seeded:
+                return self._seeded[k]
+        return self.default
+
+
+DICE_RNG: RngStreams = RngStreams(DICE_RNG_BACKEND)
+"""RngStreams : The random number streams dice are rolled with."""
+
+
+class DiceTerm(NamedTuple):
+    """A single parsed dice specification such as ``4d6!k3``.
+
+    Attributes
+    ----------
+    dice (int): Number of dice to roll.
+    sides (int): Number of sides on each die.
+    explode (bool): Whether a die that rolls its maximum is rolled again.
+    keep_drop (str): ``'k'`` to keep or ``'d'`` to drop the highest dice, or an
+                     empty string for neither.
+    number (int): How many dice are kept or dropped.
+
+    """
+    dice: int
+    sides: int
+    explode: bool
+    keep_drop: str
+    number: int
+
+    @classmethod
+    def parse(cls, dice_spec: str) -> 'DiceTerm':
+        """Parse a dice specification.
+
+        Parameters
+        ----------
+        dice_spec (str): The specification of the dice to roll, e.g. ``3d6!k2``.
+
+        Returns
+        -------
+        DiceTerm: The parsed specification.
+
+        """
+        dice_string, sides_string, explode_string, keep_drop = \
+            re.findall(Die.DICE_SPEC, dice_spec)[0]
+        return cls(
+            dice=int(dice_string),
+            sides=int(sides_string),
+            explode=explode_string == '!',
+            keep_drop=keep_drop[:1],
+            number=int(keep_drop[1:]) if keep_drop else 0,
+        )
+
+    def pmf(self) -> np.ndarray | None:
+        """Calculate the exact probability mass function of the total.
+
+        Plain and exploding dice are the convolution of the single die
+        distribution with itself. Explosion chains are followed until they are
+        less likely than :data:`EXACT_TAIL_PROBABILITY` or reach
+        :data:`EXPLODE_DEPTH`, matching the simulation. Keeping or dropping
+        dice uses the order statistics of the dice, see :meth:`_keep_pmf`.
+
+        Returns
+        -------
+        np.ndarray | None: The probability of each total, indexed by the total,
+                           or None if the calculation is not tractable.
+
+        """
+        if self.keep_drop:
+            if self.explode or self.sides * self.dice ** 2 > EXACT_MAX_KEEP_STEPS:
+                return None
+            if self.keep_drop == 'k':
+                return self._keep_pmf(min(self.number, self.dice), highest=True)
+            return self._keep_pmf(max(0, self.dice - self.number), highest=False)
+
+        if self.explode and self.sides == 1:
+            single: np.ndarray = np.zeros(EXPLODE_DEPTH + 2)
+            single[-1] = 1.0
+        elif self.explode:
+            p: float = 1 / self.sides
+            depth: int = min(EXPLODE_DEPTH, math.ceil(math.log(EXACT_TAIL_PROBABILITY) / math.log(p)))
+            single = np.zeros(self.sides * (depth + 1))
+            for k in range(depth + 1):
+                chain: float = p ** k * (1 - p) if k < depth else p ** depth
+                single[self.sides * k + 1:self.sides * (k + 1)] += chain / (self.sides - 1)
+        else:
+            single = np.full(self.sides + 1, 1 / self.sides)
+            single[0] = 0.0
+        if (len(single) - 1) * self.dice + 1 > EXACT_MAX_SUPPORT:
+            return None
+
+        # Exponentiation by squaring keeps the number of convolutions at
+        # O(log(dice)).
+        result: np.ndarray = np.ones(1)
+        power: int = self.dice
+        while power:
+            if power & 1:
+                result = np.convolve(result, single)
+            power >>= 1
+            if power:
+                single = np.convolve(single, single)
+        return result
+
+    def _keep_pmf(self, keep: int, highest: bool) -> np.ndarray:
+        """Exact distribution of the sum of the highest or lowest dice.
+
+        The faces are visited from the most to the least favoured and the
+        number of remaining dice showing each face is binomially distributed.
+        The state tracks how many dice have been placed and the sum of those
+        that were kept.
+
+        Parameters
+        ----------
+        keep (int): The number of dice kept.
+        highest (bool): Keep the highest dice if True, otherwise the lowest.
+
+        Returns
+        -------
+        np.ndarray: The probability of each total, indexed by the total.
+
+        """
+        state: np.ndarray = np.zeros((self.dice + 1, keep * self.sides + 1))
+        state[0, 0] = 1.0
+        faces: range = range(self.sides, 0, -1) if highest else range(1, self.sides + 1)
+        for faces_left, face in zip(range(self.sides, 0, -1), faces):
+            p: float = 1 / faces_left
+            new_state: np.ndarray = np.zeros_like(state)
+            for placed in range(self.dice + 1):
+                row: np.ndarray = state[placed]
+                if not row.any():
+                    continue
+                remaining: int = self.dice - placed
+                counts: range = range(remaining + 1) if faces_left > 1 else range(remaining, remaining + 1)
+                for count in counts:
+                    chance: float = math.comb(remaining, count) * p ** count * (1 - p) ** (remaining - count) \
+                        if faces_left > 1 else 1.0
+                    shift: int = min(count, max(0, keep - placed)) * face
+                    new_state[placed + count, shift:] += row[:row.size - shift] * chance
+            state = new_state
+        return state[self.dice]
+
+
+class Distribution:
+    """A discrete probability distribution of dice roll results.
+
+    Parameters
+    ----------
+    values (np.ndarray): The possible results in increasing order.
+    probs (np.ndarray): The probability of each result.
+    trials (int | None): The number of simulated rolls the distribution was
+                         estimated from, or None if it is exact.
+
+    """
+
+    def __init__(self, values: np.ndarray, probs: np.ndarray, trials: int | None = None) -> None:
+        self.values: np.ndarray = values
+        self.probs: np.ndarray = probs / probs.sum()
+        self.trials: int | None = trials
+
+    def __repr__(self) -> str:
+        return f'<Distribution - {len(self.values)} values>'
+
+    @classmethod
+    def from_outcomes(cls, outcomes: np.ndarray, weights: np.ndarray | None = None,
+                      trials: int | None = None) -> 'Distribution':
+        """Collect results, optionally weighted, into a distribution.
+
+        Parameters
+        ----------
+        outcomes (np.ndarray): The integer result of each outcome.
+        weights (np.ndarray | None): The probability of each outcome, or None
+                                     if each outcome is a simulated roll.
+        trials (int | None): The number of simulated rolls, if any.
+
+        Returns
+        -------
+        Distribution: The distribution of the results.
+
+        """
+        values, inverse = np.unique(outcomes, return_inverse=True)
+        probs: np.ndarray = np.bincount(inverse.ravel(), weights=weights, minlength=len(values))
+        return cls(values, probs.astype(float), trials)
+
+    @property
+    def mean(self) -> float:
+        """The expected result."""
+        return float(np.dot(self.values, self.probs))
+
+    @property
+    def stdev(self) -> float:
+        """The standard deviation of the results."""
+        return float(np.sqrt(max(0.0, np.dot((self.values - self.mean) ** 2, self.probs))))
+
+    def percentile(self, q: float) -> int:
+        """The smallest result at or above the ``q`` percentile.
+
+        Parameters
+        ----------
+        q (float): The percentile, between 0 and 100.
+
+        Returns
+        -------
+        int: The percentile result.
+
+        """
+        cdf: np.ndarray = np.cumsum(self.probs)
+        index: int = int(np.searchsorted(cdf, q / 100 - 1e-12))
+        return int(self.values[min(index, len(self.values) - 1)])
+
+    def render_png(self, title: str) -> bytes:
+        """Plot the distribution as a bar chart.
+
+        The plot is drawn with matplotlib's object oriented API straight onto
+        an Agg canvas. This avoids pyplot's global figure registry, and
+        matplotlib is not imported until the first plot is rendered.
+
+        Results are binned into at most PLOT_MAX_BINS bars, one per result
+        when the range is narrow enough, and the bars are drawn as a single
+        filled outline so plotting time does not grow with the range.
+
+        Parameters
+        ----------
+        title (str): The title of the plot, the mean and standard deviation
+                     are added below it.
+
+        Returns
+        -------
+        bytes: The plot as a PNG image.
+
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig: Figure = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        bins: int = min(int(self.values[-1] - self.values[0]) + 1, PLOT_MAX_BINS)
+        heights, edges = np.histogram(self.values, bins=bins, weights=self.probs,
+                                      range=(self.values[0] - 0.5, self.values[-1] + 0.5))
+        ax.stairs(heights / np.diff(edges), edges, fill=True)
+        ax.set_xlabel('Result')
+        ax.set_ylabel('Probability Density')
+        ax.set_title(f'{title}\n$\\mu={self.mean:0.2f}, \\sigma={self.stdev:0.2f}$')
+        fig.tight_layout()
+        png: io.BytesIO = io.BytesIO()
+        fig.savefig(png, format='png')
+        return png.getvalue()
 
 
 class Die:
@@ -187,6 +836,8 @@ class Die:
     
     """
 
+    __slots__ = ('sides', 'exploded', 'keep', '__value')
+
     def __init__(self, sides: int, exploded: bool=False) -> None:
         self.sides: int = sides
         self.exploded: bool = exploded
@@ -200,7 +851,7 @@ class Die:
     """re.Pattern : A regex string to define the components of a die roll."""
 
     @classmethod
-    def multi_roll(cls, dice_spec: str) -> list:
+    def multi_roll(cls, dice_spec: str) -> 'DiceRoll':
         """Roll a number of dice with a specified number of sides.
 
         Parameters
@@ -211,54 +862,40 @@ class Die:
         
         Returns
         -------
-        list[Die]: A list of the roll results.
+        DiceRoll: The roll results.
 
         """
-        parsed: list[tuple[str, str, str, str]] = re.findall(Die.DICE_SPEC, dice_spec)
-        dice_string: str = ''
-        sides_string: str = ''
-        explode_string: str = ''
-        keep_drop: str = ''
-        dice_string, sides_string, explode_string, keep_drop = \
-            parsed[0] if parsed else (None, None, None, None)
-        
-        dice: int = int(dice_string)
-        sides: int = int(sides_string)
-        explode: bool =  bool(explode_string)
-        
-        results: list[Die] = [cls(sides) for _ in range(dice)]
-        results.sort(key=lambda x: x.value)
-        if explode == '!':
-            explode_results: list[Die] = []
-            for r in results:
-                explode_results.append(r)
-                while explode_results[-1].critical_hit:
-                    explode_results.append(cls(sides, True))
-            results = explode_results[:]
-
-        if keep_drop:
-            fn: str = keep_drop[0]
-            number: int = int(keep_drop[1:])
-            results.sort(key=lambda x: x.value)
-            if fn == 'k':
-                keep: list[Die] = results[-number:]
-                drop: list[Die] = results[:-number]
-                for d in drop: d.keep = False
-                results = drop + keep
-            elif fn == 'd':
-                keep: list[Die] = results[:-number]
-                drop: list[Die] = results[-number:]
-                for d in drop: d.keep = False
-                results = keep + drop
-        return results
+        return cls.roll_term(DiceTerm.parse(dice_spec))
+
+    @classmethod
+    def roll_term(cls, term: DiceTerm, rng: np.random.Generator | None = None) -> 'DiceRoll':
+        """Roll the dice described by a parsed dice specification.
+
+        Parameters
+        ----------
+        term (DiceTerm): The parsed dice specification.
+        rng (np.random.Generator | None): The random number source, the
+                                          default stream if None.
+
+        Returns
+        -------
+        DiceRoll: The roll results.
+
+        """
+        return DiceRoll.roll(term, rng)
 
     @staticmethod
-    def dice_roller(roll: str) -> tuple[str, int]:
+    def dice_roller(roll: str, rng: np.random.Generator | None = None) -> tuple[str, int]:
         """Processes a dice roll string.
 
+        The roll string is compiled into a :class:`RollPlan`, which is cached,
+        and the plan is rolled.
+
         Parameters
         ----------
         roll (str): A dice roll string specification.
+        rng (np.random.Generator | None): The random number source, the
+                                          default stream if None.
         
         Returns
         -------
@@ -266,57 +903,143 @@ class Die:
                          the total value of the rolls.
         
         """
-        roll_exp: str = roll
-        dice_rolls: list[str] = re.findall(Die.DICE_REGEX, roll)
-        dice_results: list[Die] = [Die.multi_roll(r) for r in dice_rolls]
-        for i, r in enumerate(dice_rolls):
-            str_result: str = '+'.join([str(d.value) for d in dice_results[i]])
-            fstr_result: str = '+'.join([str(d) for d in dice_results[i]])
-            str_result_disp: str = f'[{fstr_result}]'
-            str_result_exp: str = f'({str_result})'
-            roll: str = roll.replace(r, str_result_disp, 1)
-            roll_exp: str = roll_exp.replace(r, str_result_exp, 1)
-        
-        result: int = int(utils.eval_expr(roll_exp))
-        return roll, result
+        return RollPlan.from_string(roll).roll(rng)
+
+    @classmethod
+    def batch_roll(cls, term: DiceTerm, n: int,
+                   rng: np.random.Generator | None = None) -> np.ndarray:
+        """Roll a dice specification ``n`` times at once.
+
+        This is the vectorized equivalent of summing the values returned by
+        :meth:`roll_term`. Every die for every trial is drawn as a single
+        array, explosions are drawn as run lengths for all trials and keep/drop
+        is applied with a sort along the dice axis.
+
+        Parameters
+        ----------
+        term (DiceTerm): The parsed dice specification.
+        n (int): The number of trials to roll.
+        rng (np.random.Generator | None): The random number source, the
+                                          default stream if None.
+
+        Returns
+        -------
+        np.ndarray: The total of the dice specification for each trial.
+
+        """
+        rng = rng or DICE_RNG.default
+        dice: int = term.dice
+        sides: int = term.sides
+
+        maxed: np.ndarray = np.zeros(n, dtype=np.int64)
+        if not term.explode:
+            rolls: np.ndarray = rng.integers(1, sides + 1, size=(n, dice))
+        elif sides > 1:
+            # An exploding die is a run of maximum rolls ended by a single
+            # non-maximum roll, so only the run length and the final roll need
+            # to be drawn rather than every die in the chain.
+            runs: np.ndarray = rng.geometric(1 - 1 / sides, size=(n, dice)) - 1
+            maxed = np.minimum(runs, EXPLODE_DEPTH).sum(axis=1)
+            rolls = rng.integers(1, sides, size=(n, dice))
+        else:
+            maxed = np.full(n, EXPLODE_DEPTH * dice, dtype=np.int64)
+            rolls = np.ones((n, dice), dtype=np.int64)
+        total: np.ndarray = rolls.sum(axis=1) + sides * maxed
+        if not term.keep_drop:
+            return total
+
+        # The highest dice are the maximum rolls from explosions followed by
+        # the largest of the remaining rolls.
+        number: int = term.number
+        kept_max: np.ndarray = np.minimum(maxed, number)
+        ranked: np.ndarray = -np.sort(-rolls, axis=1)
+        running: np.ndarray = np.zeros((n, dice + 1), dtype=np.int64)
+        np.cumsum(ranked, axis=1, out=running[:, 1:])
+        remaining: np.ndarray = np.clip(number - kept_max, 0, dice)
+        high: np.ndarray = sides * kept_max + np.take_along_axis(running, remaining[:, None], axis=1)[:, 0]
+        if term.keep_drop == 'k':
+            return high
+        return total - high
 
     @staticmethod
-    def dice_sim(roll: str, n: int = 10000) -> tuple[float, float, str]:
-        """Simulate dice rolls repeatedly to collect statistics.
+    def dice_sim_results(roll: str, n: int = 10000,
+                         rng: np.random.Generator | None = None) -> np.ndarray:
+        """Simulate a dice roll string repeatedly.
 
         Parameters
         ----------
         roll (str): The dice roll specification.
         n (int): Number of iterations to execute.
+        rng (np.random.Generator | None): The random number source, the
+                                          default stream if None.
+
+        Returns
+        -------
+        np.ndarray: The integer result of each simulated roll.
 
         """
-        results: list[int] = [Die.dice_roller(roll)[1] for _ in range(n)]
-        r_min: int = min(results)
-        r_max: int = max(results)
-        mean: float = statistics.fmean(results)
-        stdev: float = statistics.stdev(results)
-        num_bins: int = (r_max - r_min) + 1
-        fig, ax = plt.subplots()
-        h_data, bins, patches = ax.hist(results, num_bins, density=True)
+        return RollPlan.from_string(roll).simulate(n, rng)
 
-        ax.set_xlabel('Result')
-        ax.set_ylabel('Probability Density')
-        ax.set_title(f'Histogram of {roll} Rolled {n:,} Times\n$\\mu={mean:0.0f}, \\sigma={stdev:0.2f}$')
-        now: datetime.datetime = datetime.datetime.now()
-        fname = f'/tmp/dbot_roll_sim_{now.strftime("%Y_%m_%d_%H_%M_%S")}.png'
-        fig.tight_layout()
-        fig.savefig(fname)
-        logger.debug(fname)
+    @staticmethod
+    def dice_sim(roll: str, n: int = 10000, exact: bool = False,
+                 seed: int | None = None) -> tuple[bytes, Distribution]:
+        """Simulate dice rolls repeatedly to collect statistics.
+
+        Parameters
+        ----------
+        roll (str): The dice roll specification.
+        n (int): Number of iterations to execute.
+        exact (bool): Calculate the exact distribution instead of simulating
+                      when it is tractable.
+        seed (int | None): Seed for a reproducible simulation, or None to use
+                           the default stream.
 
-        return fname
+        Returns
+        -------
+        tuple[bytes, Distribution]: The histogram rendered as a PNG image and
+                                    the distribution it shows.
+
+        """
+        plan: RollPlan = RollPlan.from_string(roll)
+        dist: Distribution | None = plan.distribution() if exact else None
+        if dist is None:
+            rng: np.random.Generator | None = DICE_RNG.new_stream(seed) if seed is not None else None
+            dist = Distribution.from_outcomes(plan.simulate(n, rng), trials=n)
+
+        if dist.trials:
+            title: str = f'Histogram of {roll} Rolled {n:,} Times'
+        else:
+            title = f'Exact Distribution of {roll}'
+        return dist.render_png(title), dist
 
     def __str__(self):
-        ret_val = str(self.__value)
-        if self.critical_hit or self.critical_fail:
+        return Die.format_value(self.__value, self.sides, self.exploded, self.keep)
+
+    @staticmethod
+    def format_value(value: int, sides: int, exploded: bool, keep: bool) -> str:
+        """Format a die for display in Discord markdown.
+
+        Critical hits and fails are bold, exploded dice are underlined and
+        dropped dice are struck through.
+
+        Parameters
+        ----------
+        value (int): The value rolled.
+        sides (int): Number of sides for the die.
+        exploded (bool): Identifies if this dice roll was from an exploded roll.
+        keep (bool): Identifies if this die counts towards the total.
+
+        Returns
+        -------
+        str: The formatted die.
+
+        """
+        ret_val = str(value)
+        if value == sides or value == 1:
             ret_val = f'**{ret_val}**'
-        if self.exploded:
+        if exploded:
             ret_val = f'__{ret_val}__'
-        if not self.keep:
+        if not keep:
             ret_val = f'~~{ret_val}~~'
         return ret_val
 
@@ -331,7 +1054,7 @@ class Die:
         -------
         (int): The value of the roll.
         """
-        self.__value =  random.choice(range(1, self.sides + 1))
+        self.__value = int(DICE_RNG.default.integers(1, self.sides + 1))
         return self.__value
     
     @property
@@ -367,6 +1090,433 @@ class Die:
         """
         return self.__value == 1
 
+
+class DiceRoll:
+    """The dice rolled for one dice specification.
+
+    The dice are stored as parallel arrays rather than one object per die, so
+    a large or exploding roll costs a handful of allocations. Iterating yields
+    a lightweight :class:`DieView` for each die.
+
+    Parameters
+    ----------
+    sides (int): Number of sides for the dice.
+    values (np.ndarray): The value rolled on each die, in display order.
+    exploded (np.ndarray): Identifies the dice rolled because of an explosion.
+    kept (np.ndarray): Identifies the dice that count towards the total.
+
+    """
+
+    __slots__ = ('sides', 'values', 'exploded', 'kept')
+
+    def __init__(self, sides: int, values: np.ndarray, exploded: np.ndarray, kept: np.ndarray) -> None:
+        self.sides: int = sides
+        self.values: np.ndarray = values
+        self.exploded: np.ndarray = exploded
+        self.kept: np.ndarray = kept
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self):
+        return (DieView(self, i) for i in range(len(self.values)))
+
+    def __str__(self) -> str:
+        return '+'.join(
+            Die.format_value(v, self.sides, e, k)
+            for v, e, k in zip(self.values.tolist(), self.exploded.tolist(), self.kept.tolist())
+        )
+
+    def __repr__(self) -> str:
+        return f'<DiceRoll - {len(self)}d{self.sides}>'
+
+    @property
+    def total(self) -> int:
+        """The sum of the dice that are kept."""
+        return int(self.values[self.kept].sum())
+
+    @classmethod
+    def roll(cls, term: DiceTerm, rng: np.random.Generator | None = None) -> 'DiceRoll':
+        """Roll the dice described by a parsed dice specification.
+
+        The dice are drawn in bulk and sorted lowest first, each followed by
+        its explosion chain. When dice are kept or dropped all the dice are
+        sorted lowest first and the kept flags set on the highest or lowest.
+
+        Parameters
+        ----------
+        term (DiceTerm): The parsed dice specification.
+        rng (np.random.Generator | None): The random number source, the
+                                          default stream if None.
+
+        Returns
+        -------
+        DiceRoll: The roll results.
+
+        """
+        rng = rng or DICE_RNG.default
+        values: np.ndarray = np.sort(rng.integers(1, term.sides + 1, size=term.dice))
+        exploded: np.ndarray = np.zeros(term.dice, dtype=bool)
+        if term.explode:
+            values, exploded = cls._explode(values, term.sides, rng)
+
+        kept: np.ndarray = np.ones(len(values), dtype=bool)
+        if term.keep_drop:
+            order: np.ndarray = np.argsort(values, kind='stable')
+            values, exploded = values[order], exploded[order]
+            split: int = max(0, len(values) - term.number)
+            if term.keep_drop == 'k':
+                kept[:split] = False
+            else:
+                kept[split:] = False
+        return cls(term.sides, values, exploded, kept)
+
+    @staticmethod
+    def _explode(initial: np.ndarray, sides: int,
+                 rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+        """Insert the explosion chain after each die that rolled its maximum.
+
+        A chain is a run of maximum rolls ended by a non-maximum roll, limited
+        to EXPLODE_DEPTH extra dice, so it is drawn as a run length and a
+        final roll like :meth:`Die.batch_roll` does.
+
+        Parameters
+        ----------
+        initial (np.ndarray): The initial dice, lowest first.
+        sides (int): Number of sides for the dice.
+        rng (np.random.Generator | None): The random number source, the
+                                          default stream if None.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]: The values and exploded flags of the
+                                       dice including the chains.
+
+        """
+        maxed: np.ndarray = initial == sides
+        if sides > 1:
+            runs: np.ndarray = rng.geometric(1 - 1 / sides, size=initial.size) - 1
+            finals: np.ndarray = rng.integers(1, sides, size=initial.size)
+            extras: np.ndarray = np.where(maxed, np.minimum(runs + 1, EXPLODE_DEPTH), 0)
+        else:
+            runs = np.full(initial.size, EXPLODE_DEPTH)
+            finals = np.ones(initial.size, dtype=initial.dtype)
+            extras = np.full(initial.size, EXPLODE_DEPTH)
+
+        lengths: np.ndarray = extras + 1
+        owner: np.ndarray = np.repeat(np.arange(initial.size), lengths)
+        offset: np.ndarray = np.arange(owner.size) - (np.cumsum(lengths) - lengths)[owner]
+        values: np.ndarray = np.where(
+            offset == 0,
+            initial[owner],
+            np.where(offset <= runs[owner], sides, finals[owner]),
+        )
+        return values, offset > 0
+
+
+class DieView:
+    """A read only view of one die in a :class:`DiceRoll`.
+
+    Provides the same properties as :class:`Die` without copying the die out
+    of its arrays.
+
+    Parameters
+    ----------
+    dice (DiceRoll): The roll the die belongs to.
+    index (int): The position of the die in the roll.
+
+    """
+
+    __slots__ = ('_dice', '_index')
+
+    def __init__(self, dice: DiceRoll, index: int) -> None:
+        self._dice: DiceRoll = dice
+        self._index: int = index
+
+    def __str__(self) -> str:
+        return Die.format_value(self.raw_value, self._dice.sides, self.exploded, self.keep)
+
+    @property
+    def raw_value(self) -> int:
+        """The value rolled, whether or not the die is kept."""
+        return int(self._dice.values[self._index])
+
+    @property
+    def value(self) -> int:
+        """The value rolled, or 0 if the die is dropped."""
+        return self.raw_value if self.keep else 0
+
+    @property
+    def exploded(self) -> bool:
+        """Identifies if this die was rolled because of an explosion."""
+        return bool(self._dice.exploded[self._index])
+
+    @property
+    def keep(self) -> bool:
+        """Identifies if this die counts towards the total."""
+        return bool(self._dice.kept[self._index])
+
+    @property
+    def critical_hit(self) -> bool:
+        """Identifies if the die rolled its maximum."""
+        return self.raw_value == self._dice.sides
+
+    @property
+    def critical_fail(self) -> bool:
+        """Identifies if the die rolled a 1."""
+        return self.raw_value == 1
+
+
+class RollPlan:
+    """A dice roll string compiled once into a reusable plan.
+
+    The roll string is scanned for dice specifications a single time. Each one
+    is parsed into a :class:`DiceTerm` and replaced by a placeholder variable in
+    the math expression, so rolling or simulating the plan only has to draw
+    dice and evaluate the expression. Plans are immutable and shared through
+    an LRU cache, see :meth:`from_string`.
+
+    Parameters
+    ----------
+    spec (str): A normalized dice roll string specification.
+
+    Raises
+    ------
+    DiceLimitExceeded: If a die has no sides.
+
+    """
+
+    VARIABLE: str = '_dice{}'
+    """str : Format of the placeholder variable names used in the expression."""
+
+    def __init__(self, spec: str) -> None:
+        self.spec: str = spec
+        terms: list[DiceTerm] = []
+        def placeholder(match: re.Match) -> str:
+            terms.append(DiceTerm.parse(match.group(0)))
+            return RollPlan.VARIABLE.format(len(terms) - 1)
+        self.expression: str = Die.DICE_REGEX.sub(placeholder, spec)
+        self.terms: tuple[DiceTerm, ...] = tuple(terms)
+        self.literals: tuple[str, ...] = tuple(Die.DICE_REGEX.split(spec)[::2])
+        if any(term.sides < 1 for term in self.terms):
+            raise DiceLimitExceeded('dice must have at least 1 side')
+        self.cost: RollCost = self._estimate_cost()
+
+    def _estimate_cost(self) -> RollCost:
+        """Estimate the cost of a roll from the dice specifications alone.
+
+        Exploding dice add ``dice / (sides - 1)`` dice on average, or the whole
+        EXPLODE_DEPTH for one sided dice. Each die is displayed as its digits,
+        a separator and the markdown expected for it.
+
+        Returns
+        -------
+        RollCost: The estimate.
+
+        """
+        dice: int = 0
+        sides: int = 0
+        expected_dice: float = 0.0
+        output_chars: int = sum(len(lit) for lit in self.literals)
+        for term in self.terms:
+            term_dice: float = float(term.dice)
+            if term.explode:
+                term_dice *= 1 + (1 / (term.sides - 1) if term.sides > 1 else EXPLODE_DEPTH)
+            dice += term.dice
+            sides = max(sides, term.sides)
+            expected_dice += term_dice
+            # Digits and separator, bold for critical rolls, underline for
+            # exploded dice and strikethrough for dropped dice.
+            chars: float = term_dice * (len(str(term.sides)) + 1 + 4 * min(1.0, 2 / term.sides))
+            chars += 4 * (term_dice - term.dice)
+            if term.keep_drop == 'k':
+                chars += 4 * max(0.0, term_dice - term.number)
+            elif term.keep_drop == 'd':
+                chars += 4 * min(term_dice, term.number)
+            output_chars += 2 + math.ceil(chars)
+        return RollCost(dice, sides, expected_dice, output_chars)
+
+    def check(self) -> None:
+        """Make sure the plan is within the configured resource limits.
+
+        This only looks at :attr:`cost`, so it is O(1) and nothing is rolled.
+
+        Raises
+        ------
+        DiceLimitExceeded: If the plan uses too many dice or too many sides.
+
+        """
+        if self.cost.sides > ROLL_MAX_SIDES:
+            raise DiceLimitExceeded(f'dice may have at most {ROLL_MAX_SIDES:,} sides')
+        if self.cost.expected_dice > ROLL_MAX_DICE:
+            raise DiceLimitExceeded(f'at most {ROLL_MAX_DICE:,} dice may be rolled at once')
+
+    def __repr__(self) -> str:
+        return f'<RollPlan - {self.spec}>'
+
+    @staticmethod
+    def normalize(roll: str) -> str:
+        """Normalize a dice roll string for use as a cache key.
+
+        Parameters
+        ----------
+        roll (str): A dice roll string specification.
+
+        Returns
+        -------
+        str: The roll string with surrounding and repeated whitespace removed.
+
+        """
+        return ' '.join(roll.split())
+
+    @classmethod
+    def from_string(cls, roll: str) -> 'RollPlan':
+        """Get the compiled plan for a dice roll string.
+
+        Parameters
+        ----------
+        roll (str): A dice roll string specification.
+
+        Returns
+        -------
+        RollPlan: The compiled plan, from the cache if it was compiled before.
+
+        """
+        return _compile_plan(cls.normalize(roll))
+
+    def roll(self, rng: np.random.Generator | None = None) -> tuple[str, int]:
+        """Roll the plan once.
+
+        The plan is checked against the resource limits first. If the result
+        is expected to be, or turns out to be, too long to display die by die
+        only the total of each dice specification is shown.
+
+        Parameters
+        ----------
+        rng (np.random.Generator | None): The random number source, the
+                                          default stream if None.
+
+        Returns
+        -------
+        tuple[str, int]: A string that shows the results of the dice rolls and
+                         the total value of the rolls.
+
+        Raises
+        ------
+        DiceLimitExceeded: If the plan is over the resource limits.
+
+        """
+        self.check()
+        rolls: list[DiceRoll] = [Die.roll_term(term, rng) for term in self.terms]
+        display: str = ''
+        if self.cost.output_chars <= ROLL_MAX_OUTPUT:
+            display = self._join(f'[{dice}]' for dice in rolls)
+        # The estimate can be short for exploding or large dice pools, so the
+        # real length decides too.
+        if not display or len(display) > ROLL_MAX_OUTPUT:
+            display = self._join(f'[{dice.total}]' for dice in rolls)
+        # The totals are written into the expression, numexpr only takes a
+        # limited number of named inputs.
+        expression: str = self._join(f'({dice.total})' for dice in rolls)
+        result: int = int(utils.eval_expr_array(expression, {}))
+        return display, result
+
+    def _join(self, parts: Iterable[str]) -> str:
+        pieces: list[str] = [self.literals[0]]
+        for part, literal in zip(parts, self.literals[1:]):
+            pieces.append(part)
+            pieces.append(literal)
+        return ''.join(pieces)
+
+    def simulate(self, n: int = 10000,
+                 rng: np.random.Generator | None = None) -> np.ndarray:
+        """Roll the plan repeatedly.
+
+        Each dice specification in the plan is rolled for all trials with
+        :meth:`Die.batch_roll` and the expression is evaluated over the
+        resulting arrays. Trials are run in batches to bound memory use for
+        large dice pools.
+
+        Parameters
+        ----------
+        n (int): Number of iterations to execute, at least one is.
+        rng (np.random.Generator | None): The random number source, the
+                                          default stream if None.
+
+        Returns
+        -------
+        np.ndarray: The integer result of each simulated roll.
+
+        Raises
+        ------
+        DiceLimitExceeded: If the plan is over the resource limits, has more
+                           than EXPR_MAX_TERMS dice specifications or the
+                           simulation would draw more than SIM_MAX_DRAWS dice.
+
+        """
+        self.check()
+        n = max(1, n)
+        if len(self.terms) > EXPR_MAX_TERMS:
+            raise DiceLimitExceeded(f'at most {EXPR_MAX_TERMS} dice specifications may be simulated at once')
+        if n * self.cost.dice > SIM_MAX_DRAWS:
+            raise DiceLimitExceeded(f'at most {SIM_MAX_DRAWS:,} dice may be simulated at once')
+        rng = rng or DICE_RNG.default
+        dice_per_trial: int = self.cost.dice
+        batch_size: int = max(1, SIM_BATCH_DRAWS // max(1, dice_per_trial))
+        results: list[np.ndarray] = []
+        for start in range(0, n, batch_size):
+            count: int = min(batch_size, n - start)
+            variables: dict[str, np.ndarray] = {
+                RollPlan.VARIABLE.format(i): Die.batch_roll(t, count, rng)
+                for i, t in enumerate(self.terms)
+            }
+            batch: np.ndarray = np.broadcast_to(utils.eval_expr_array(self.expression, variables), (count,))
+            results.append(np.trunc(batch).astype(np.int64))
+        return np.concatenate(results)
+
+    def distribution(self) -> Distribution | None:
+        """Calculate the exact distribution of the plan.
+
+        The exact distribution of each dice specification is calculated with
+        :meth:`DiceTerm.pmf` and the expression is evaluated over every
+        combination of their totals, weighted by the joint probability.
+
+        Returns
+        -------
+        Distribution | None: The exact distribution, or None if it is not
+                             tractable to calculate.
+
+        """
+        if len(self.terms) > EXPR_MAX_TERMS:
+            return None
+        supports: list[tuple[np.ndarray, np.ndarray]] = []
+        for term in self.terms:
+            pmf: np.ndarray | None = term.pmf()
+            if pmf is None:
+                return None
+            totals: np.ndarray = np.flatnonzero(pmf)
+            supports.append((totals, pmf[totals]))
+        if math.prod(len(t) for t, _ in supports) > EXACT_MAX_OUTCOMES:
+            return None
+
+        grids: list[np.ndarray] = np.meshgrid(*(t for t, _ in supports), indexing='ij')
+        variables: dict[str, np.ndarray] = {
+            RollPlan.VARIABLE.format(i): g.ravel() for i, g in enumerate(grids)
+        }
+        weights: np.ndarray = np.ones(1)
+        for _, probs in supports:
+            weights = np.multiply.outer(weights, probs).ravel()
+        outcomes: np.ndarray = np.broadcast_to(
+            utils.eval_expr_array(self.expression, variables), weights.shape)
+        return Distribution.from_outcomes(np.trunc(outcomes).astype(np.int64), weights)
+
+
+@functools.lru_cache(maxsize=ROLL_PLAN_CACHE_SIZE)
+def _compile_plan(spec: str) -> RollPlan:
+    """Compile a normalized roll string, memoized by :func:`functools.lru_cache`."""
+    return RollPlan(spec)
+
+
 async def setup(bot: commands.Bot) -> None:
     """Add this :obj:`discord.ext.command.Cog` to the identified :obj:`discord.ext.command.Bot`.
 
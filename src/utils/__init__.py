@@ -5,4 +5,6 @@ from .utils import DBOT_LOG_FILE
 from .utils import dbot_logger_config
 from .utils import get_dbot_logger
 from .utils import dev_only
-from .utils import eval_expr
\ No newline at end of file
+from .utils import eval_expr
+from .utils import eval_expr_array
+from .cache import TTLCache
\ No newline at end of file
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""A small size and time bounded cache with an optional on-disk tier.
+
+"""
+import collections
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Any, Hashable
+
+from .utils import DBOT_LOGGER_ID
+
+logger: logging.Logger = logging.getLogger(DBOT_LOGGER_ID)
+
+class TTLCache:
+    """A least recently used cache whose entries also expire after a time.
+
+    Entries are evicted when they are older than ``ttl``, when the cache holds
+    more than ``max_entries`` entries or when the sizes reported for the
+    entries add up to more than ``max_bytes``. If a ``directory`` is given
+    every entry is also pickled to a file there so it survives a restart; a
+    miss in memory falls back to the file before giving up.
+
+    Parameters
+    ----------
+    max_entries
+        The most entries held in memory.
+    ttl
+        Seconds an entry stays valid.
+    max_bytes
+        The most bytes, as reported to :meth:`put`, held in memory. None for
+        no limit.
+    directory
+        Where to keep the on-disk tier, or None for a memory only cache.
+    max_disk_entries
+        The most entries kept on disk, the oldest files are removed first.
+        The files are counted as they are written and only listed and pruned
+        once there are a tenth more than this, so a :meth:`put` does not scan
+        the directory.
+
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 3600.0,
+                 max_bytes: int | None = None, directory: str | Path | None = None,
+                 max_disk_entries: int = 1024) -> None:
+        self.max_entries: int = max_entries
+        self.ttl: float = ttl
+        self.max_bytes: int | None = max_bytes
+        self.directory: Path | None = Path(directory) if directory else None
+        self.max_disk_entries: int = max_disk_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: collections.OrderedDict[Hashable, tuple[float, int, Any]] = collections.OrderedDict()
+        self._bytes: int = 0
+        self._disk_files: int = 0
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_files = sum(1 for _ in self.directory.glob('*.pickle'))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f'<TTLCache - {len(self)} entries, {self.hits} hits, {self.misses} misses>'
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Look up a cached value.
+
+        Parameters
+        ----------
+        key
+            The key the value was stored under.
+        default
+            Returned when there is no valid entry for ``key``.
+
+        """
+        entry: tuple[float, int, Any] | None = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+        if entry:
+            self._discard(key)
+
+        if self.directory:
+            value, size, remaining = self._read_disk(key)
+            if remaining > 0:
+                self._store(key, value, size, remaining)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return default
+
+    def put(self, key: Hashable, value: Any, size: int = 0, ttl: float | None = None) -> None:
+        """Store a value.
+
+        Parameters
+        ----------
+        key
+            The key to store the value under, its :func:`repr` must be stable
+            between runs when the on-disk tier is used.
+        value
+            The value to store, it must be picklable when the on-disk tier is
+            used.
+        size
+            The approximate size of the value in bytes.
+        ttl
+            Seconds this entry stays valid, instead of the cache default.
+
+        """
+        ttl = self.ttl if ttl is None else ttl
+        self._store(key, value, size, ttl)
+        if self.directory:
+            self._write_disk(key, value, size, ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove an entry from every tier.
+
+        Parameters
+        ----------
+        key
+            The key to remove.
+
+        """
+        self._discard(key)
+        if self.directory:
+            self._unlink(self._disk_path(key))
+
+    def clear(self) -> None:
+        """Remove every entry held in memory."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def _store(self, key: Hashable, value: Any, size: int, ttl: float) -> None:
+        self._discard(key)
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            oldest: Hashable = next(iter(self._entries))
+            self._discard(oldest)
+
+    def _discard(self, key: Hashable) -> None:
+        entry: tuple[float, int, Any] | None = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry[1]
+
+    def _disk_path(self, key: Hashable) -> Path:
+        digest: str = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+        return self.directory / f'{digest}.pickle'
+
+    def _read_disk(self, key: Hashable) -> tuple[Any, int, float]:
+        path: Path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires, stored_key, size, value = pickle.load(f)
+        except FileNotFoundError:
+            return None, 0, 0.0
+        except Exception as e:
+            logger.warning(f'Discarding unreadable cache file {path}: {e}')
+            self._unlink(path)
+            return None, 0, 0.0
+        remaining: float = expires - time.time()
+        if stored_key != key or remaining <= 0:
+            self._unlink(path)
+            return None, 0, 0.0
+        return value, size, remaining
+
+    def _write_disk(self, key: Hashable, value: Any, size: int, ttl: float) -> None:
+        path: Path = self._disk_path(key)
+        existed: bool = path.exists()
+        try:
+            with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as f:
+                pickle.dump((time.time() + ttl, key, size, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, path)
+        except Exception as e:
+            logger.warning(f'Unable to write cache file {path}: {e}')
+            return
+        if not existed:
+            self._disk_files += 1
+        if self._disk_files > self.max_disk_entries + max(1, self.max_disk_entries // 10):
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        files: list[tuple[float, Path]] = []
+        for path in self.directory.glob('*.pickle'):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        files.sort()
+        for _, old in files[:max(0, len(files) - self.max_disk_entries)]:
+            old.unlink(missing_ok=True)
+        self._disk_files = min(len(files), self.max_disk_entries)
+
+    def _unlink(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        self._disk_files = max(0, self._disk_files - 1)
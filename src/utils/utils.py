@@ -3,6 +3,7 @@ import logging
 import logging.handlers
 import math
 import numexpr as ne
+import numpy as np
 import os
 
 from discord.ext import commands
@@ -83,3 +84,18 @@ def eval_expr(expr:str='0') -> float:
     result = ne.evaluate(expr).item()
     return result
 
+def eval_expr_array(expr: str, variables: dict[str, int | np.ndarray]) -> np.ndarray:
+    """Evaluate a string as a math expression with named values.
+
+    Parameters
+    ----------
+    expr
+        An expression, as a :class:`str`, to evaluate.
+    variables
+        A mapping of the names used in ``expr`` to the scalars or arrays they
+        represent. Arrays are evaluated element-wise.
+    
+    """
+    local_dict: dict = {'pi': math.pi, 'e': math.e, 'tau': math.tau}
+    local_dict.update(variables)
+    return ne.evaluate(expr, local_dict=local_dict)